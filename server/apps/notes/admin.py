@@ -1,13 +1,56 @@
 from django.contrib import admin
+from django.db.models import Q
+from django.http import HttpResponseBadRequest
+from django.urls import path
+from apps.users.changelist import LargeTableAdminMixin, KeysetChangeList
+from apps.users.concurrency import VersionedAdminMixin
+from apps.users.filters import email_prefix_q, name_prefix_q
+from apps.users.models import User, email_key
+from .export import EXPORT_FORMATS, streaming_export
 from .models import Note
+from . import search, sync
 
+ADMIN_EXPORT_FIELDS = ('id', 'user_id', 'name', 'description', 'created_at', 'updated_at')
 
-class NoteAdmin(admin.ModelAdmin):
+
+class UserEmailFilter(admin.SimpleListFilter):
+    """Owner filter taking an email instead of listing every user"""
+    title = 'user'
+    parameter_name = 'user_email'
+    template = 'admin/notes/user_email_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(user__email_normalized=email_key(self.value()))
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            'selected': self.value() is None,
+            'query_string': changelist.get_query_string(remove=[self.parameter_name]),
+            'display': 'All',
+            'hidden_params': [
+                (key, value) for key, value in changelist.params.items()
+                if key not in (self.parameter_name, KeysetChangeList.cursor_param)
+            ],
+        }
+
+
+class NoteAdmin(VersionedAdminMixin, LargeTableAdminMixin, admin.ModelAdmin):
     """Admin for Note"""
 
     list_display = ('name', 'user', 'created_at', 'updated_at')
-    list_filter = ('created_at', 'updated_at', 'user')
+    list_filter = ('created_at', 'updated_at', UserEmailFilter)
+    list_select_related = ('user',)
+    autocomplete_fields = ('user',)
     search_fields = ('name', 'description', 'user__email', 'user__name')
+    ordering = ('-id',)
     readonly_fields = ('created_at', 'updated_at')
     fieldsets = (
         (None, {
@@ -19,10 +62,57 @@ class NoteAdmin(admin.ModelAdmin):
         }),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        """Owner email or name prefix, or name/description through the full-text index"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        query = Q(user_id__in=User.objects.filter(
+            email_prefix_q(search_term) | name_prefix_q(search_term)).values('id'))
+        if search.is_indexed():
+            query |= Q(id__in=search.matching_ids(search_term))
+        else:
+            query |= Q(name__icontains=search_term) | Q(description__icontains=search_term)
+        return queryset.filter(query), False
+
+    actions = ['export_csv']
+
+    def get_urls(self):
+        urls = [
+            path(
+                'export/',
+                self.admin_site.admin_view(self.export_view),
+                name='notes_note_export'
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def export_view(self, request):
+        """Stream notes of all users, ?format=ndjson|csv"""
+        export_format = request.GET.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return HttpResponseBadRequest('Unsupported format')
+        return streaming_export(
+            request, Note.objects.order_by('id'), export_format,
+            fields=ADMIN_EXPORT_FIELDS, filename='all_notes')
+
+    def export_csv(self, request, queryset):
+        """Stream selected notes as CSV"""
+        return streaming_export(
+            request, queryset.order_by('id'), 'csv',
+            fields=ADMIN_EXPORT_FIELDS, filename='notes')
+    export_csv.short_description = "Export selected notes as CSV"
+
     def save_model(self, request, obj, form, change):
         if not change:
             obj.user = request.user
         super().save_model(request, obj, form, change)
 
+    def delete_model(self, request, obj):
+        sync.delete_notes(Note.objects.filter(id=obj.id))
+
+    def delete_queryset(self, request, queryset):
+        sync.delete_notes(queryset)
+
 
 admin.site.register(Note, NoteAdmin)
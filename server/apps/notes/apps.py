@@ -9,3 +9,4 @@ class NotesConfig(AppConfig):
 
     def ready(self):
         import apps.notes.admin
+        import apps.notes.signals  # noqa: F401
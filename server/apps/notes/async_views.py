@@ -0,0 +1,225 @@
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+
+from apps.users import conditional, encoders
+from apps.users.authentication import AsyncJWTAuthentication
+from apps.users.renderers import FastJSONRenderer
+
+from . import cache as note_cache
+from .models import Note, NotesVersion
+from .pagination import NoteCursorPagination
+from .projection import note_projection
+from .serializers import NoteSerializer
+from .sync import delete_notes
+
+_authentication = AsyncJWTAuthentication()
+_renderer = FastJSONRenderer() if encoders.is_enabled() else JSONRenderer()
+
+
+def _json_response(data, status=status.HTTP_200_OK, headers=None):
+    return HttpResponse(
+        _renderer.render(data),
+        status=status,
+        content_type='application/json',
+        headers=headers,
+    )
+
+
+def async_api_view(methods):
+    """
+    Async counterpart of DRF's APIView dispatch for the notes API:
+    method check, JWT authentication and IsAuthenticated permission.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        async def wrapped_view(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+
+            try:
+                result = await _authentication.aauthenticate(request)
+            except exceptions.APIException as e:
+                return _json_response(
+                    e.detail if isinstance(e.detail, (list, dict)) else {'detail': e.detail},
+                    status=e.status_code,
+                    headers={'WWW-Authenticate': _authentication.authenticate_header(request)}
+                )
+
+            if result is None:
+                return _json_response(
+                    {'detail': 'Authentication credentials were not provided.'},
+                    status=status.HTTP_401_UNAUTHORIZED,
+                    headers={'WWW-Authenticate': _authentication.authenticate_header(request)}
+                )
+
+            request.user, request.auth = result
+            try:
+                return await view_func(request, *args, **kwargs)
+            except exceptions.APIException as e:
+                return _json_response(
+                    e.detail if isinstance(e.detail, (list, dict)) else {'detail': e.detail},
+                    status=e.status_code
+                )
+
+        wrapped_view.csrf_exempt = True
+        return wrapped_view
+    return decorator
+
+
+def _request_data(request):
+    try:
+        return json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+
+
+async def _cache_version(request):
+    if note_cache.is_enabled():
+        return await note_cache.aget_version(request.user.id)
+    return None
+
+
+async def _cached_response(request, version):
+    if version is None:
+        return None
+    entry = await note_cache.aget_response(request, version)
+    if entry is None:
+        return None
+    data, etag, last_modified = entry
+    not_modified = conditional.precondition_response(request, etag, last_modified)
+    if not_modified is not None:
+        return not_modified
+    return conditional.set_validators(_json_response(data), etag, last_modified)
+
+
+def _parse_error():
+    return _json_response(
+        {'detail': 'JSON parse error'},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+@async_api_view(['GET', 'POST'])
+async def note_list(request):
+    if request.method == 'POST':
+        return await _create(request)
+
+    version = await _cache_version(request)
+    cached = await _cached_response(request, version)
+    if cached is not None:
+        return cached
+
+    notes = Note.objects.filter(user_id=request.user.id)
+
+    validators = conditional.list_validators(
+        request, *await NotesVersion.objects.acurrent(request.user.id))
+    not_modified = conditional.precondition_response(request, *validators)
+    if not_modified is not None:
+        return not_modified
+
+    paginator = NoteCursorPagination(request)
+    projection = note_projection(request)
+    if projection is not None:
+        rows = paginator.paginate_queryset(projection.values(notes, 'id', 'created_at'))
+        rows, links = paginator.get_page([row async for row in rows])
+        data = {'notes': projection.encode(rows), **links}
+    else:
+        notes = paginator.paginate_queryset(notes)
+        notes, links = paginator.get_page([note async for note in notes])
+        data = {'notes': NoteSerializer(notes, many=True).data, **links}
+    if version is not None:
+        await note_cache.aset_response(request, version, data, *validators)
+    return conditional.set_validators(_json_response(data), *validators)
+
+
+async def _create(request):
+    data = _request_data(request)
+    if data is None:
+        return _parse_error()
+
+    serializer = NoteSerializer(data=data)
+    if not serializer.is_valid():
+        return _json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer.validated_data.pop('version', None)
+    note = await Note.objects.acreate(user_id=request.user.id, **serializer.validated_data)
+    return _json_response(
+        {'note': NoteSerializer(note).data},
+        status=status.HTTP_201_CREATED
+    )
+
+
+@async_api_view(['GET', 'PUT', 'DELETE'])
+async def note_detail(request, pk):
+    version = None
+    if request.method == 'GET':
+        version = await _cache_version(request)
+        cached = await _cached_response(request, version)
+        if cached is not None:
+            return cached
+
+    if request.method == 'GET' and conditional.is_conditional(request):
+        row = await Note.objects.filter(id=pk).values('user_id', 'updated_at').afirst()
+        if row is not None and row['user_id'] == request.user.id:
+            not_modified = conditional.precondition_response(
+                request, *conditional.object_validators(pk, row['updated_at']))
+            if not_modified is not None:
+                return not_modified
+
+    projection = note_projection(request) if request.method == 'GET' else None
+    if projection is not None:
+        note = await projection.values(
+            Note.objects.filter(id=pk), 'id', 'user_id', 'updated_at').afirst()
+        owner = None if note is None else (note['id'], note['user_id'], note['updated_at'])
+    else:
+        note = await Note.objects.filter(id=pk).afirst()
+        owner = None if note is None else (note.id, note.user_id, note.updated_at)
+    if owner is None:
+        return _json_response(
+            {'detail': 'Not found.'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    note_id, user_id, updated_at = owner
+    action = {'GET': 'access', 'PUT': 'update', 'DELETE': 'delete'}[request.method]
+    if user_id != request.user.id:
+        return _json_response(
+            {'error': f'You do not have permission to {action} this note'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    validators = conditional.object_validators(note_id, updated_at)
+    if request.method == 'GET':
+        if projection is not None:
+            data = {'note': projection.encode([note])[0]}
+        else:
+            data = {'note': NoteSerializer(note).data}
+        if version is not None:
+            await note_cache.aset_response(request, version, data, *validators)
+        return conditional.set_validators(_json_response(data), *validators)
+
+    failed = conditional.precondition_response(request, *validators)
+    if failed is not None:
+        return failed
+
+    if request.method == 'PUT':
+        data = _request_data(request)
+        if data is None:
+            return _parse_error()
+
+        serializer = NoteSerializer(note, data=data, partial=True)
+        if not serializer.is_valid():
+            return _json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        await sync_to_async(serializer.save)()
+        return conditional.set_validators(
+            _json_response({'note': NoteSerializer(note).data}),
+            *conditional.object_validators(note.id, note.updated_at))
+
+    await sync_to_async(delete_notes)(Note.objects.filter(id=note_id))
+    return _json_response({'id': note_id}, status=status.HTTP_200_OK)
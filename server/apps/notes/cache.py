@@ -0,0 +1,135 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def _config():
+    return {
+        'ENABLED': True,
+        'CACHE_ALIAS': 'default',
+        'TIMEOUT': 300,
+        'PREFIX': 'notes',
+        **getattr(settings, 'NOTES_RESPONSE_CACHE', {}),
+    }
+
+
+class _Stats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def as_dict(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+_stats = _Stats()
+
+
+def _cache():
+    return caches[_config()['CACHE_ALIAS']]
+
+
+def _version_key(user_id):
+    return f"{_config()['PREFIX']}:version:{user_id}"
+
+
+def _initial_version():
+    # Never restart from a small number after eviction, that would
+    # make responses cached under an earlier version valid again
+    return time.time_ns()
+
+
+def _response_key(user_id, version, request):
+    url = hashlib.sha256(request.build_absolute_uri().encode('utf-8')).hexdigest()
+    return f"{_config()['PREFIX']}:response:{user_id}:{version}:{url}"
+
+
+def is_enabled():
+    return _config()['ENABLED']
+
+
+def get_version(user_id):
+    cache = _cache()
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        cache.add(_version_key(user_id), _initial_version(), timeout=None)
+        version = cache.get(_version_key(user_id))
+    return version
+
+
+async def aget_version(user_id):
+    """Async variant of get_version"""
+    cache = _cache()
+    version = await cache.aget(_version_key(user_id))
+    if version is None:
+        await cache.aadd(_version_key(user_id), _initial_version(), timeout=None)
+        version = await cache.aget(_version_key(user_id))
+    return version
+
+
+def _bump(user_ids):
+    cache = _cache()
+    for user_id in set(user_ids):
+        try:
+            cache.incr(_version_key(user_id))
+        except ValueError:
+            cache.add(_version_key(user_id), _initial_version(), timeout=None)
+
+
+def bump_version(*user_ids):
+    """Invalidate cached responses of users once the current transaction commits"""
+    if is_enabled():
+        transaction.on_commit(lambda: _bump(user_ids))
+
+
+def get_response(request, version):
+    """Cached (data, etag, last_modified) of a response, or None"""
+    entry = _cache().get(_response_key(request.user.id, version, request))
+    _stats.record(entry is not None)
+    return entry
+
+
+async def aget_response(request, version):
+    """Async variant of get_response"""
+    entry = await _cache().aget(_response_key(request.user.id, version, request))
+    _stats.record(entry is not None)
+    return entry
+
+
+def set_response(request, version, data, etag, last_modified):
+    _cache().set(
+        _response_key(request.user.id, version, request),
+        (data, etag, last_modified),
+        timeout=_config()['TIMEOUT']
+    )
+
+
+async def aset_response(request, version, data, etag, last_modified):
+    """Async variant of set_response"""
+    await _cache().aset(
+        _response_key(request.user.id, version, request),
+        (data, etag, last_modified),
+        timeout=_config()['TIMEOUT']
+    )
+
+
+def stats():
+    """Response cache hits and misses of this process"""
+    return _stats.as_dict()
@@ -0,0 +1,78 @@
+import csv
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from apps.users.encoders import format_datetime
+from apps.users.renderers import FastJSONRenderer
+
+EXPORT_FIELDS = ('id', 'name', 'description', 'created_at', 'updated_at')
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+CHUNK_SIZE = 2000
+
+
+class _Echo:
+    """File-like object for csv.writer that returns rows instead of buffering them"""
+
+    def write(self, value):
+        return value
+
+
+def _row_encoder(export_format, fields):
+    """Header chunk and function encoding a .values() row as one chunk"""
+    tz = timezone.get_current_timezone()
+    datetime_fields = [field for field in fields if field.endswith('_at')]
+
+    def format_datetimes(row):
+        # Same format as DRF DateTimeField in API responses
+        for field in datetime_fields:
+            if row[field] is not None:
+                row[field] = format_datetime(row[field], tz)
+        return row
+
+    if export_format == 'csv':
+        writer = csv.writer(_Echo())
+
+        def encode_csv(row):
+            row = format_datetimes(row)
+            return writer.writerow([row[field] for field in fields])
+        return writer.writerow(fields), encode_csv
+
+    renderer = FastJSONRenderer()
+    return None, lambda row: renderer.render(format_datetimes(row)) + b'\n'
+
+
+def iter_export(queryset, header, encode):
+    if header is not None:
+        yield header
+    for row in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield encode(row)
+
+
+async def aiter_export(queryset, header, encode):
+    """Async variant of iter_export, so ASGI does not buffer the whole body"""
+    if header is not None:
+        yield header
+    async for row in queryset.aiterator(chunk_size=CHUNK_SIZE):
+        yield encode(row)
+
+
+def streaming_export(request, queryset, export_format, fields=EXPORT_FIELDS, filename='notes'):
+    """
+    Stream queryset rows without materializing it: .values() rows fetched
+    in chunks through QuerySet.iterator(), or aiterator() under ASGI
+    """
+    header, encode = _row_encoder(export_format, fields)
+    rows = queryset.values(*fields)
+    if isinstance(getattr(request, '_request', request), ASGIRequest):
+        content = aiter_export(rows, header, encode)
+    else:
+        content = iter_export(rows, header, encode)
+
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.notes import sync
+
+
+class Command(BaseCommand):
+    help = 'Deletes tombstones of deleted notes older than NOTES_SYNC TOMBSTONE_TTL_DAYS'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Tombstones deleted per query'
+        )
+
+    def handle(self, *args, **options):
+        deleted = sync.prune_tombstones(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones'))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-17 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='note',
+            options={'ordering': ['-created_at', '-id']},
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='notes_user_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+from django.db import migrations
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE notes_fts USING fts5(
+        name, description, content='notes', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER notes_fts_insert AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_fts_delete AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_fts_update AFTER UPDATE OF name, description ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO notes_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')",
+]
+
+SQLITE_BACKWARD = [
+    'DROP TRIGGER IF EXISTS notes_fts_update',
+    'DROP TRIGGER IF EXISTS notes_fts_delete',
+    'DROP TRIGGER IF EXISTS notes_fts_insert',
+    'DROP TABLE IF EXISTS notes_fts',
+]
+
+# Must match apps.notes.search.POSTGRES_DOCUMENT
+POSTGRES_FORWARD = [
+    """
+    CREATE INDEX notes_search_idx ON notes USING GIN ((
+        to_tsvector('simple', coalesce(name, '') || ' ' || coalesce(description, ''))
+    ))
+    """,
+]
+
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS notes_search_idx',
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD}),
+        ),
+    ]
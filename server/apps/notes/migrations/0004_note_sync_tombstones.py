@@ -0,0 +1,45 @@
+# Generated by Django 4.2 on 2026-10-17 12:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notes', '0003_note_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('note_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'db_table': 'note_tombstones',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='note',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='notes_user_updated_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='notetombstone',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notetombstone',
+            index=models.Index(fields=['user', 'deleted_at', 'id'], name='tombstones_user_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notetombstone',
+            index=models.Index(fields=['deleted_at'], name='tombstones_deleted_at_idx'),
+        ),
+    ]
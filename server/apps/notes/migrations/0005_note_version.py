@@ -0,0 +1,54 @@
+# Generated by Django 4.2 on 2026-10-17 12:56
+
+from django.db import migrations, models
+
+# SQLite adds the column by rebuilding the notes table, which drops the
+# full-text triggers created in 0003
+SQLITE_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+        INSERT INTO notes_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE OF name, description ON notes BEGIN
+        INSERT INTO notes_fts(notes_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO notes_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    "INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')",
+]
+
+
+def restore_sqlite_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in SQLITE_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0004_note_sync_tombstones'),
+    ]
+
+    operations = [
+        # Runs last when migrating backwards, after RemoveField rebuilt the table again
+        migrations.RunPython(migrations.RunPython.noop, restore_sqlite_triggers),
+        migrations.AddField(
+            model_name='note',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(restore_sqlite_triggers, migrations.RunPython.noop),
+    ]
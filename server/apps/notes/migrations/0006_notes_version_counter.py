@@ -0,0 +1,56 @@
+# Generated by Django 4.2 on 2026-10-17 13:50
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 1000
+
+
+def backfill_notes_versions(apps, schema_editor):
+    """changed_at of every user with notes or tombstones, the latest write or delete"""
+    Note = apps.get_model('notes', 'Note')
+    NoteTombstone = apps.get_model('notes', 'NoteTombstone')
+    NotesVersion = apps.get_model('notes', 'NotesVersion')
+    db_alias = schema_editor.connection.alias
+
+    def latest(model, field):
+        return model.objects.using(db_alias).order_by().values('user_id').annotate(
+            changed_at=models.Max(field)).values_list('user_id', 'changed_at').iterator()
+
+    batch = []
+    for user_id, changed_at in latest(Note, 'updated_at'):
+        batch.append(NotesVersion(user_id=user_id, changed_at=changed_at))
+        if len(batch) == BATCH_SIZE:
+            NotesVersion.objects.using(db_alias).bulk_create(batch)
+            batch = []
+    NotesVersion.objects.using(db_alias).bulk_create(batch)
+
+    # Tombstones are kept for a limited time only, so these are few users
+    for user_id, deleted_at in latest(NoteTombstone, 'deleted_at'):
+        versions = NotesVersion.objects.using(db_alias).filter(user_id=user_id)
+        if not versions.filter(changed_at__gte=deleted_at).exists():
+            versions.update_or_create(user_id=user_id, defaults={'changed_at': deleted_at})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0012_user_name_prefix_index'),
+        ('notes', '0005_note_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotesVersion',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('changed_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'notes_versions',
+            },
+        ),
+        migrations.RunPython(backfill_notes_versions, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,11 @@
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
+from apps.users.concurrency import VersionedModelMixin
 
-class Note(models.Model):
+
+class Note(VersionedModelMixin, models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     user = models.ForeignKey(
@@ -10,12 +13,99 @@ class Note(models.Model):
         on_delete=models.CASCADE,
         related_name='notes'
     )
+    version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         db_table = 'notes'
-        ordering = ['-created_at']
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(
+                fields=['user', 'created_at', 'id'],
+                name='notes_user_created_id_idx'
+            ),
+            models.Index(
+                fields=['user', 'updated_at', 'id'],
+                name='notes_user_updated_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.name
+
+
+class NoteTombstone(models.Model):
+    """Id of a deleted note, kept for delta sync until TTL pruning"""
+    note_id = models.BigIntegerField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_index=False
+    )
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'note_tombstones'
+        indexes = [
+            models.Index(
+                fields=['user', 'deleted_at', 'id'],
+                name='tombstones_user_deleted_idx'
+            ),
+            models.Index(fields=['deleted_at'], name='tombstones_deleted_at_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.note_id} deleted at {self.deleted_at}'
+
+
+class NotesVersionManager(models.Manager):
+    def current(self, user_id):
+        """(version, changed_at) of the notes of user_id, (0, None) before any write"""
+        return self.filter(user_id=user_id).values_list(
+            'version', 'changed_at').first() or (0, None)
+
+    async def acurrent(self, user_id):
+        """Async variant of current"""
+        return await self.filter(user_id=user_id).values_list(
+            'version', 'changed_at').afirst() or (0, None)
+
+    def bump(self, user_ids):
+        """Count a write to the notes of each user, in the current transaction"""
+        user_ids = set(user_ids)
+        if not user_ids:
+            return
+        changes = {'version': models.F('version') + 1, 'changed_at': timezone.now()}
+        rows = self.filter(user_id__in=user_ids)
+        if rows.update(**changes) < len(user_ids):
+            # First write of some user: create the missing rows, counting
+            # the write again for the others only moves their version on
+            self.bulk_create([
+                NotesVersion(user_id=user_id, changed_at=changes['changed_at'])
+                for user_id in user_ids
+            ], ignore_conflicts=True)
+            rows.update(**changes)
+
+
+class NotesVersion(models.Model):
+    """
+    Count and time of the latest write to the notes of a user, deletes
+    included, so list validators take one primary key lookup
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='+'
+    )
+    version = models.PositiveBigIntegerField(default=0)
+    changed_at = models.DateTimeField()
+
+    objects = NotesVersionManager()
+
+    class Meta:
+        db_table = 'notes_versions'
+
+    def __str__(self):
+        return f'{self.user_id} version {self.version}'
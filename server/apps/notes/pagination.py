@@ -0,0 +1,5 @@
+from apps.users.pagination import CreatedAtCursorPagination
+
+
+class NoteCursorPagination(CreatedAtCursorPagination):
+    """Keyset pagination of notes, backed by notes_user_created_id_idx"""
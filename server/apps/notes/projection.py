@@ -0,0 +1,76 @@
+from django.db.models.functions import Substr
+from rest_framework.exceptions import ValidationError
+
+from apps.users import encoders
+
+from .serializers import NoteSerializer
+
+PREVIEW_ALIAS = 'description_preview'
+MAX_PREVIEW = 10000
+
+
+class NoteProjection:
+    """
+    Notes read as .values() rows restricted to the requested fields,
+    with description optionally truncated by the database
+    """
+
+    def __init__(self, field_names=None, preview=None):
+        aliases = None
+        if preview and (field_names is None or 'description' in field_names):
+            aliases = (('description', PREVIEW_ALIAS),)
+        else:
+            preview = None
+        self.preview = preview
+        self.encoder = encoders.row_encoder(NoteSerializer, field_names, aliases)
+
+    def values(self, queryset, *required):
+        """Rows with the projected columns plus required ones, e.g. for pagination"""
+        columns = list(self.encoder.fields)
+        columns += [column for column in required if column not in columns]
+        expressions = {}
+        if self.preview:
+            expressions[PREVIEW_ALIAS] = Substr('description', 1, self.preview)
+        return queryset.values(*columns, **expressions)
+
+    def encode(self, rows):
+        return self.encoder.encode(rows)
+
+
+def _parse_fields(value):
+    if value is None:
+        return None
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    available = NoteSerializer.Meta.fields
+    unknown = sorted(names - set(available))
+    if unknown:
+        raise ValidationError({'fields': [f"Unknown field: {', '.join(unknown)}"]})
+    if not names:
+        raise ValidationError({'fields': ['At least one field is required.']})
+    # Keep serializer order so the cached encoder is shared across permutations
+    return tuple(name for name in available if name in names)
+
+
+def _parse_preview(value):
+    if value is None:
+        return None
+    try:
+        preview = int(value)
+    except ValueError:
+        preview = 0
+    if not 1 <= preview <= MAX_PREVIEW:
+        raise ValidationError(
+            {'preview': [f'Must be an integer between 1 and {MAX_PREVIEW}.']})
+    return preview
+
+
+def note_projection(request):
+    """
+    NoteProjection for ?fields= and ?preview=, full rows when
+    FAST_SERIALIZATION is enabled, otherwise None for the serializer path
+    """
+    field_names = _parse_fields(request.GET.get('fields'))
+    preview = _parse_preview(request.GET.get('preview'))
+    if field_names is None and preview is None and not encoders.is_enabled():
+        return None
+    return NoteProjection(field_names, preview)
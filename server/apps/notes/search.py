@@ -0,0 +1,59 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Must match the expression of the GIN index created in migration 0003
+POSTGRES_DOCUMENT = (
+    "to_tsvector('simple', coalesce(notes.name, '') || ' ' || coalesce(notes.description, ''))"
+)
+POSTGRES_QUERY = "plainto_tsquery('simple', %s)"
+
+_token_re = re.compile(r'\w+', re.UNICODE)
+
+
+def _fts5_query(query):
+    """Quote every term so user input can not use FTS5 query syntax"""
+    return ' '.join(f'"{token}"*' for token in _token_re.findall(query))
+
+
+def is_indexed():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def matching_ids(query):
+    """Subquery of ids of notes matching query, answered from the full-text index"""
+    if not _token_re.search(query):
+        return RawSQL('SELECT id FROM notes WHERE 1 = 0', ())
+    if connection.vendor == 'sqlite':
+        return RawSQL(
+            'SELECT rowid FROM notes_fts WHERE notes_fts MATCH %s', (_fts5_query(query),))
+    return RawSQL(
+        f'SELECT id FROM notes WHERE {POSTGRES_DOCUMENT} @@ {POSTGRES_QUERY}', (query,))
+
+
+def search_notes(queryset, query):
+    """Notes of queryset matching query, best matches first"""
+    if not _token_re.search(query):
+        return queryset.none()
+
+    if connection.vendor == 'sqlite':
+        return queryset.extra(
+            select={'rank': 'bm25(notes_fts)'},
+            tables=['notes_fts'],
+            where=['notes_fts.rowid = notes.id', 'notes_fts MATCH %s'],
+            params=[_fts5_query(query)],
+        ).order_by('rank', '-id')
+
+    if connection.vendor == 'postgresql':
+        return queryset.extra(
+            select={'rank': f'ts_rank({POSTGRES_DOCUMENT}, {POSTGRES_QUERY})'},
+            select_params=[query],
+            where=[f'{POSTGRES_DOCUMENT} @@ {POSTGRES_QUERY}'],
+            params=[query],
+        ).order_by('-rank', '-id')
+
+    return queryset.filter(
+        Q(name__icontains=query) | Q(description__icontains=query)
+    ).order_by('-created_at', '-id')
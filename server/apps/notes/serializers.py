@@ -1,13 +1,49 @@
 from rest_framework import serializers
+from rest_framework.settings import api_settings
+from apps.users.concurrency import VersionedUpdateMixin
 from .models import Note
 
 
-class NoteSerializer(serializers.ModelSerializer):
+class NoteSerializer(VersionedUpdateMixin, serializers.ModelSerializer):
     class Meta:
         model = Note
-        fields = ('id', 'name', 'description', 'created_at', 'updated_at')
+        fields = ('id', 'name', 'description', 'version', 'created_at', 'updated_at')
         read_only_fields = ('id', 'created_at', 'updated_at')
+        extra_kwargs = {
+            'version': {'required': False},
+        }
 
     def create(self, validated_data):
-        validated_data['user'] = self.context['request'].user
+        validated_data.pop('version', None)
+        validated_data['user_id'] = self.context['request'].user.id
         return super().create(validated_data)
+
+
+class NoteBulkUpdateSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    # Expected current version, the item fails with 409 when it differs
+    version = serializers.IntegerField(required=False)
+    name = serializers.CharField(max_length=255, required=False)
+    description = serializers.CharField(
+        required=False, allow_blank=True, allow_null=True)
+
+
+class NoteBulkSerializer(serializers.Serializer):
+    max_items = 1000
+
+    create = NoteSerializer(many=True, required=False)
+    update = NoteBulkUpdateSerializer(many=True, required=False)
+    delete = serializers.ListField(
+        child=serializers.IntegerField(), required=False)
+
+    def to_internal_value(self, data):
+        # Reject oversized requests before validating every item
+        if isinstance(data, dict):
+            total = sum(len(data[op]) for op in ('create', 'update', 'delete')
+                        if isinstance(data.get(op), list))
+            if total > self.max_items:
+                raise serializers.ValidationError({
+                    api_settings.NON_FIELD_ERRORS_KEY: [
+                        f'At most {self.max_items} operations per request.'],
+                })
+        return super().to_internal_value(data)
@@ -0,0 +1,12 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import cache
+from .models import Note, NotesVersion
+
+
+@receiver(post_save, sender=Note)
+def bump_notes_version(sender, instance, **kwargs):
+    """Invalidate cached responses of the owner on every save, API or admin"""
+    NotesVersion.objects.bump([instance.user_id])
+    cache.bump_version(instance.user_id)
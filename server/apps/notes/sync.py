@@ -0,0 +1,170 @@
+import base64
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Note, NotesVersion, NoteTombstone
+from . import cache
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class ExpiredCursor(Exception):
+    pass
+
+
+def _config():
+    return {
+        'PAGE_SIZE': 500,
+        'TOMBSTONE_TTL_DAYS': 30,
+        'SAFETY_WINDOW_SECONDS': 10,
+        **getattr(settings, 'NOTES_SYNC', {}),
+    }
+
+
+def tombstone_ttl():
+    return timedelta(days=_config()['TOMBSTONE_TTL_DAYS'])
+
+
+def safety_window():
+    return timedelta(seconds=_config()['SAFETY_WINDOW_SECONDS'])
+
+
+def delete_notes(queryset):
+    """Delete notes of queryset leaving a tombstone per note for delta sync"""
+    with transaction.atomic():
+        rows = list(queryset.values_list('id', 'user_id'))
+        if not rows:
+            return 0
+        now = timezone.now()
+        NoteTombstone.objects.bulk_create([
+            NoteTombstone(note_id=note_id, user_id=user_id, deleted_at=now)
+            for note_id, user_id in rows
+        ])
+        Note.objects.filter(id__in=[note_id for note_id, _ in rows]).delete()
+        user_ids = {user_id for _, user_id in rows}
+        NotesVersion.objects.bump(user_ids)
+        cache.bump_version(*user_ids)
+    return len(rows)
+
+
+def encode_cursor(cursor):
+    data = {
+        'n': [cursor['n'][0].isoformat(), cursor['n'][1]] if cursor['n'] else None,
+        't': [cursor['t'][0].isoformat(), cursor['t'][1]],
+        'at': cursor['at'].isoformat(),
+    }
+    if cursor.get('w'):
+        data['w'] = cursor['w'].isoformat()
+    return base64.urlsafe_b64encode(
+        json.dumps(data, separators=(',', ':')).encode('ascii')).decode('ascii')
+
+
+def _position(value):
+    timestamp = parse_datetime(value[0])
+    if timestamp is None:
+        raise ValueError
+    return timestamp, int(value[1])
+
+
+def decode_cursor(encoded):
+    """
+    Cursor holding one (timestamp, id) position per stream, notes and
+    tombstones, the time it was issued and, between pages, the time the
+    first page of the pass was read
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+        issued_at = parse_datetime(data['at'])
+        rescan_from = parse_datetime(data['w']) if data.get('w') else None
+        if issued_at is None or (data.get('w') and rescan_from is None):
+            raise ValueError
+        return {
+            'n': _position(data['n']) if data['n'] else None,
+            't': _position(data['t']),
+            'at': issued_at,
+            'w': rescan_from,
+        }
+    except (TypeError, ValueError, KeyError, IndexError):
+        raise InvalidCursor
+
+
+def _after(queryset, field, position):
+    if position is None:
+        return queryset
+    timestamp, row_id = position
+    return queryset.filter(
+        Q(**{f'{field}__gt': timestamp}) | Q(**{field: timestamp, 'id__gt': row_id}))
+
+
+def _rescan(position, timestamp):
+    """position, moved back to timestamp when it lies past it"""
+    if position is None or position[0] < timestamp:
+        return position
+    return timestamp, 0
+
+
+def changes(user_id, cursor=None, limit=None):
+    """
+    Notes created or updated and ids of notes deleted after cursor,
+    both read in (timestamp, id) order from the per-user indexes.
+    Returns (notes, deleted_ids, next_cursor, has_more).
+
+    Timestamps are taken before commit, so a row may become visible after
+    rows with later timestamps were read. The cursor ending a pass therefore
+    points SAFETY_WINDOW_SECONDS before the first page of the pass was read,
+    and the next pass sends rows of that window again. Clients apply changes
+    by id, which makes the repeats harmless.
+    """
+    limit = limit or _config()['PAGE_SIZE']
+    now = timezone.now()
+    if cursor is None:
+        # Initial sync: every note, no deletions to replay
+        cursor = {'n': None, 't': (now, 0), 'at': now}
+    elif cursor['at'] < now - tombstone_ttl():
+        # Tombstones the client has not seen may be pruned already
+        raise ExpiredCursor
+
+    notes = list(_after(
+        Note.objects.filter(user_id=user_id), 'updated_at', cursor['n']
+    ).order_by('updated_at', 'id')[:limit + 1])
+    tombstones = list(_after(
+        NoteTombstone.objects.filter(user_id=user_id), 'deleted_at', cursor['t']
+    ).order_by('deleted_at', 'id').values_list('deleted_at', 'id', 'note_id')[:limit + 1])
+
+    has_more = len(notes) > limit or len(tombstones) > limit
+    notes, tombstones = notes[:limit], tombstones[:limit]
+
+    next_cursor = {
+        'n': (notes[-1].updated_at, notes[-1].id) if notes else cursor['n'],
+        't': tombstones[-1][:2] if tombstones else cursor['t'],
+        'at': now,
+        'w': cursor.get('w') or now,
+    }
+    if not has_more:
+        # Late rows are younger than the first read of the pass minus the window,
+        # rows of its later pages were read after it and need no rescan
+        rescan_from = next_cursor.pop('w') - safety_window()
+        next_cursor['n'] = _rescan(next_cursor['n'], rescan_from)
+        next_cursor['t'] = _rescan(next_cursor['t'], rescan_from)
+    return notes, [note_id for _, _, note_id in tombstones], next_cursor, has_more
+
+
+def prune_tombstones(batch_size=1000, now=None):
+    """Delete tombstones older than the TTL in id chunks, returns rows deleted"""
+    cutoff = (now or timezone.now()) - tombstone_ttl()
+    deleted = 0
+    while True:
+        ids = list(NoteTombstone.objects.filter(
+            deleted_at__lt=cutoff
+        ).order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += NoteTombstone.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,106 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from apps.users.models import User
+
+from . import cache as note_cache
+from .models import Note
+
+
+class NoteResponseCacheTests(TestCase):
+    """Notes responses are served from the cache until the owner writes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('user@example.com', 'Secret123!', name='User')
+        cls.note = Note.objects.create(user=cls.user, name='First')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def names(self, response):
+        return [note['name'] for note in response.json()['notes']]
+
+    def test_miss_then_hit(self):
+        before = note_cache.stats()
+        first = self.client.get('/api/notes/')
+        self.assertEqual(note_cache.stats()['misses'], before['misses'] + 1)
+
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/notes/')
+        self.assertEqual(note_cache.stats()['hits'], before['hits'] + 1)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_detail_hit(self):
+        url = f'/api/notes/{self.note.id}/'
+        first = self.client.get(url)
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+        self.assertEqual(second.content, first.content)
+
+    def test_invalidated_on_write(self):
+        self.assertEqual(self.names(self.client.get('/api/notes/')), ['First'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/notes/', {'name': 'Second'}, format='json')
+        self.assertEqual(sorted(self.names(self.client.get('/api/notes/'))), ['First', 'Second'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/api/notes/{self.note.id}/', {'name': 'Renamed'}, format='json')
+        self.assertEqual(sorted(self.names(self.client.get('/api/notes/'))), ['Renamed', 'Second'])
+        self.assertEqual(
+            self.client.get(f'/api/notes/{self.note.id}/').json()['note']['name'], 'Renamed')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(f'/api/notes/{self.note.id}/')
+        self.assertEqual(self.names(self.client.get('/api/notes/')), ['Second'])
+
+    def test_disabled(self):
+        before = note_cache.stats()
+        with self.settings(NOTES_RESPONSE_CACHE={'ENABLED': False}):
+            self.client.get('/api/notes/')
+            self.client.get('/api/notes/')
+        self.assertEqual(note_cache.stats(), before)
+
+
+@override_settings(NOTES_RESPONSE_CACHE={'ENABLED': False})
+class NoteListValidatorTests(TestCase):
+    """List ETags come from one lookup and move on every write, deletes included"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('user@example.com', 'Secret123!', name='User')
+        cls.note = Note.objects.create(user=cls.user, name='First')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def etag(self):
+        return self.client.get('/api/notes/')['ETag']
+
+    def test_not_modified_in_one_query(self):
+        etag = self.etag()
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/notes/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_page_does_not_aggregate(self):
+        with self.assertNumQueries(2):
+            self.client.get('/api/notes/')
+
+    def test_every_write_moves_etag(self):
+        etags = [self.etag()]
+        self.client.post('/api/notes/', {'name': 'Second'}, format='json')
+        etags.append(self.etag())
+        self.client.put(f'/api/notes/{self.note.id}/', {'name': 'Renamed'}, format='json')
+        etags.append(self.etag())
+        self.client.post('/api/notes/bulk/', {'create': [{'name': 'Third'}]}, format='json')
+        etags.append(self.etag())
+        self.client.delete(f'/api/notes/{self.note.id}/')
+        etags.append(self.etag())
+        self.assertEqual(len(set(etags)), len(etags))
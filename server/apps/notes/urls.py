@@ -1,18 +1,40 @@
+from django.conf import settings
 from django.urls import path
-from .views import NoteViewSet
+from . import async_views
+from .views import NoteExportView, NoteViewSet
 
-note_list = NoteViewSet.as_view({
-    'get': 'list',
-    'post': 'create'
+if settings.ASYNC_VIEWS:
+    note_list = async_views.note_list
+    note_detail = async_views.note_detail
+else:
+    note_list = NoteViewSet.as_view({
+        'get': 'list',
+        'post': 'create'
+    })
+
+    note_detail = NoteViewSet.as_view({
+        'get': 'retrieve',
+        'put': 'update',
+        'delete': 'destroy'
+    })
+
+note_search = NoteViewSet.as_view({
+    'get': 'search'
+})
+
+note_changes = NoteViewSet.as_view({
+    'get': 'changes'
 })
 
-note_detail = NoteViewSet.as_view({
-    'get': 'retrieve',
-    'put': 'update',
-    'delete': 'destroy'
+note_bulk = NoteViewSet.as_view({
+    'post': 'bulk'
 })
 
 urlpatterns = [
     path('', note_list, name='note-list'),
+    path('search/', note_search, name='note-search'),
+    path('changes/', note_changes, name='note-changes'),
+    path('bulk/', note_bulk, name='note-bulk'),
+    path('export/', NoteExportView.as_view(), name='note-export'),
     path('<int:pk>/', note_detail, name='note-detail'),
 ]
@@ -1,17 +1,120 @@
 from rest_framework import viewsets, permissions, status
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.views import APIView
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404
 from django.shortcuts import get_object_or_404
-from .models import Note
-from .serializers import NoteSerializer
+from django.utils import timezone
+from apps.users import conditional
+from apps.users.concurrency import ConflictError
+from apps.users.renderers import FastRendererMixin
+from .export import EXPORT_FORMATS, streaming_export
+from .models import Note, NotesVersion
+from .pagination import NoteCursorPagination
+from .projection import note_projection
+from .search import search_notes
+from .serializers import NoteBulkSerializer, NoteSerializer
+from . import cache as note_cache, sync
 
 
-class NoteViewSet(viewsets.ViewSet):
+class NoteViewSet(FastRendererMixin, viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
 
+    def _cached_response(self, request, version):
+        if version is None:
+            return None
+        entry = note_cache.get_response(request, version)
+        if entry is None:
+            return None
+        data, etag, last_modified = entry
+        not_modified = conditional.precondition_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return conditional.set_validators(Response(data), etag, last_modified)
+
+    def _cache_version(self, request):
+        if note_cache.is_enabled():
+            return note_cache.get_version(request.user.id)
+        return None
+
     def list(self, request):
-        notes = Note.objects.filter(user=request.user)
+        version = self._cache_version(request)
+        cached = self._cached_response(request, version)
+        if cached is not None:
+            return cached
+
+        notes = Note.objects.filter(user_id=request.user.id)
+
+        validators = conditional.list_validators(
+            request, *NotesVersion.objects.current(request.user.id))
+        not_modified = conditional.precondition_response(request, *validators)
+        if not_modified is not None:
+            return not_modified
+
+        paginator = NoteCursorPagination(request)
+        projection = note_projection(request)
+        if projection is not None:
+            rows, links = paginator.get_page(paginator.paginate_queryset(
+                projection.values(notes, 'id', 'created_at')))
+            data = {'notes': projection.encode(rows), **links}
+        else:
+            notes, links = paginator.get_page(paginator.paginate_queryset(notes))
+            data = {'notes': NoteSerializer(notes, many=True).data, **links}
+        if version is not None:
+            note_cache.set_response(request, version, data, *validators)
+        return conditional.set_validators(Response(data), *validators)
+
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'error': 'Search query is required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        notes = search_notes(Note.objects.filter(user_id=request.user.id), query)
+        projection = note_projection(request)
+        if projection is not None:
+            notes = projection.values(notes)
+
+        paginator = PageNumberPagination()
+        notes = paginator.paginate_queryset(notes, request, view=self)
+        return Response({
+            'count': paginator.page.paginator.count,
+            'notes': projection.encode(notes) if projection is not None
+            else NoteSerializer(notes, many=True).data,
+            'next': paginator.get_next_link(),
+            'previous': paginator.get_previous_link(),
+        })
+
+    def changes(self, request):
+        cursor = None
+        since = request.query_params.get('since')
+        try:
+            if since:
+                cursor = sync.decode_cursor(since)
+            notes, deleted, cursor, has_more = sync.changes(request.user.id, cursor)
+        except sync.InvalidCursor:
+            return Response(
+                {'error': 'Invalid cursor'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except sync.ExpiredCursor:
+            return Response(
+                {'error': 'Cursor expired, full sync required'},
+                status=status.HTTP_410_GONE
+            )
+
         serializer = NoteSerializer(notes, many=True)
-        return Response({'notes': serializer.data})
+        return Response({
+            'notes': serializer.data,
+            'deleted': deleted,
+            'cursor': sync.encode_cursor(cursor),
+            'has_more': has_more,
+        })
 
     def create(self, request):
         serializer = NoteSerializer(
@@ -21,42 +124,188 @@ class NoteViewSet(viewsets.ViewSet):
             return Response({'note': serializer.data}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    def bulk(self, request):
+        serializer = NoteBulkSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        creates = serializer.validated_data.get('create', [])
+        updates = serializer.validated_data.get('update', [])
+        deletes = serializer.validated_data.get('delete', [])
+
+        with transaction.atomic():
+            note_ids = {item['id'] for item in updates} | set(deletes)
+            owned = set(Note.objects.filter(
+                user_id=request.user.id, id__in=note_ids).values_list('id', flat=True))
+            # Ids of other users' notes only to tell 403 from 404
+            foreign = set(Note.objects.filter(
+                id__in=note_ids - owned).values_list('id', flat=True)) if note_ids - owned else set()
+
+            def error(note_id):
+                if note_id in owned:
+                    return None
+                if note_id in foreign:
+                    return {'id': note_id, 'status': status.HTTP_403_FORBIDDEN,
+                            'error': 'You do not have permission to modify this note'}
+                return {'id': note_id, 'status': status.HTTP_404_NOT_FOUND,
+                        'error': 'Note not found'}
+
+            for item in creates:
+                item.pop('version', None)
+            created = Note.objects.bulk_create(
+                [Note(user_id=request.user.id, **item) for item in creates])
+
+            update_results, updated_ids = [], set()
+            now = timezone.now()
+            for item in updates:
+                result = error(item['id'])
+                if result is None:
+                    # Compare-and-swap per row when the client sent the version it read
+                    rows = Note.objects.filter(id=item['id'], user_id=request.user.id)
+                    if 'version' in item:
+                        rows = rows.filter(version=item['version'])
+                    changes = {field: item[field]
+                               for field in ('name', 'description') if field in item}
+                    if rows.update(**changes, updated_at=now, version=F('version') + 1):
+                        updated_ids.add(item['id'])
+                        result = {'id': item['id'], 'status': status.HTTP_200_OK}
+                    elif 'version' in item:
+                        result = {'id': item['id'], 'status': status.HTTP_409_CONFLICT,
+                                  'error': ConflictError.default_detail}
+                    else:
+                        # Deleted since ownership was read
+                        result = {'id': item['id'], 'status': status.HTTP_404_NOT_FOUND,
+                                  'error': 'Note not found'}
+                update_results.append(result)
+            if created or updated_ids:
+                # bulk_create and update() do not send post_save
+                NotesVersion.objects.bump([request.user.id])
+                note_cache.bump_version(request.user.id)
+
+            delete_results, deleted_ids = [], []
+            for note_id in deletes:
+                result = error(note_id)
+                if result is None:
+                    deleted_ids.append(note_id)
+                    result = {'id': note_id, 'status': status.HTTP_200_OK}
+                delete_results.append(result)
+            if deleted_ids:
+                sync.delete_notes(
+                    Note.objects.filter(id__in=deleted_ids, user_id=request.user.id))
+
+            updated = Note.objects.in_bulk(updated_ids) if updated_ids else {}
+
+        for result in update_results:
+            if result['status'] == status.HTTP_200_OK and result['id'] in updated:
+                result['note'] = NoteSerializer(updated[result['id']]).data
+
+        return Response({
+            'create': [
+                {'id': note.id, 'status': status.HTTP_201_CREATED,
+                 'note': NoteSerializer(note).data}
+                for note in created
+            ],
+            'update': update_results,
+            'delete': delete_results,
+        })
+
     def retrieve(self, request, pk=None):
-        note = get_object_or_404(Note, id=pk)
+        version = self._cache_version(request)
+        cached = self._cached_response(request, version)
+        if cached is not None:
+            return cached
+
+        if conditional.is_conditional(request):
+            # Answer revalidation from updated_at alone, without loading the row
+            row = Note.objects.filter(id=pk).values('user_id', 'updated_at').first()
+            if row is not None and row['user_id'] == request.user.id:
+                not_modified = conditional.precondition_response(
+                    request, *conditional.object_validators(pk, row['updated_at']))
+                if not_modified is not None:
+                    return not_modified
 
-        if note.user != request.user:
+        projection = note_projection(request)
+        if projection is not None:
+            note = projection.values(
+                Note.objects.filter(id=pk), 'id', 'user_id', 'updated_at').first()
+            if note is None:
+                raise Http404
+            note_id, user_id, updated_at = note['id'], note['user_id'], note['updated_at']
+        else:
+            note = get_object_or_404(Note, id=pk)
+            note_id, user_id, updated_at = note.id, note.user_id, note.updated_at
+
+        if user_id != request.user.id:
             return Response(
                 {'error': 'You do not have permission to access this note'},
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        serializer = NoteSerializer(note)
-        return Response({'note': serializer.data})
+        if projection is not None:
+            data = {'note': projection.encode([note])[0]}
+        else:
+            data = {'note': NoteSerializer(note).data}
+        validators = conditional.object_validators(note_id, updated_at)
+        if version is not None:
+            note_cache.set_response(request, version, data, *validators)
+        return conditional.set_validators(Response(data), *validators)
 
     def update(self, request, pk=None):
         note = get_object_or_404(Note, id=pk)
 
-        if note.user != request.user:
+        if note.user_id != request.user.id:
             return Response(
                 {'error': 'You do not have permission to update this note'},
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        failed = conditional.precondition_response(
+            request, *conditional.object_validators(note.id, note.updated_at))
+        if failed is not None:
+            return failed
+
         serializer = NoteSerializer(note, data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
-            return Response({'note': serializer.data})
+            return conditional.set_validators(
+                Response({'note': serializer.data}),
+                *conditional.object_validators(note.id, note.updated_at))
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def destroy(self, request, pk=None):
         note = get_object_or_404(Note, id=pk)
 
-        if note.user != request.user:
+        if note.user_id != request.user.id:
             return Response(
                 {'error': 'You do not have permission to delete this note'},
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        failed = conditional.precondition_response(
+            request, *conditional.object_validators(note.id, note.updated_at))
+        if failed is not None:
+            return failed
+
         note_id = note.id
-        note.delete()
+        sync.delete_notes(Note.objects.filter(id=note_id))
         return Response({'id': note_id}, status=status.HTTP_200_OK)
+
+
+class NoteExportView(APIView):
+    """Stream all notes of the user as NDJSON or CSV"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # ?format= selects the export format, not a DRF renderer
+        return JSONRenderer(), JSONRenderer.media_type
+
+    def get(self, request):
+        export_format = request.query_params.get('format', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f'Unsupported format, use one of: {", ".join(EXPORT_FORMATS)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        notes = Note.objects.filter(user_id=request.user.id).order_by('-created_at', '-id')
+        return streaming_export(request, notes, export_format)
@@ -1,11 +1,18 @@
 from django.contrib import admin
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 from django import forms
 from django.contrib import messages
-from .models import User
+from .models import AdminJob, User
 from .enums import Role
 from rest_framework_simplejwt.token_blacklist import models as blacklist_models
 from django.contrib.auth.models import Group
+from django.urls import reverse
+from django.utils.html import format_html
+from . import counters, jobs
+from .changelist import LargeTableAdminMixin
+from .concurrency import VersionedAdminMixin
+from .filters import email_prefix_q, name_prefix_q
 
 admin.site.unregister(blacklist_models.OutstandingToken)
 admin.site.unregister(blacklist_models.BlacklistedToken)
@@ -13,7 +20,17 @@ admin.site.unregister(blacklist_models.BlacklistedToken)
 admin.site.unregister(Group)
 
 
-class UserCreationForm(forms.ModelForm):
+class UniqueEmailFormMixin:
+    """Rejects emails already taken in a different letter case"""
+
+    def clean_email(self):
+        email = self.cleaned_data.get('email')
+        if email and User.objects.email_in_use(email, exclude_id=self.instance.pk):
+            raise forms.ValidationError('User with this email already exists.')
+        return email
+
+
+class UserCreationForm(UniqueEmailFormMixin, forms.ModelForm):
     """Form for creating user with two password fields"""
     password1 = forms.CharField(
         label='Password',
@@ -45,7 +62,7 @@ class UserCreationForm(forms.ModelForm):
         return user
 
 
-class UserChangeForm(forms.ModelForm):
+class UserChangeForm(UniqueEmailFormMixin, forms.ModelForm):
     """Form for changing user with password change field"""
     password = forms.CharField(
         label='New Password',
@@ -69,7 +86,7 @@ class UserChangeForm(forms.ModelForm):
 
 
 @admin.register(User)
-class CustomUserAdmin(admin.ModelAdmin):
+class CustomUserAdmin(VersionedAdminMixin, LargeTableAdminMixin, admin.ModelAdmin):
     """Admin interface for custom User model with proper password handling"""
 
     form = UserChangeForm
@@ -102,6 +119,16 @@ class CustomUserAdmin(admin.ModelAdmin):
     ordering = ('email',)
     readonly_fields = ('last_login', 'created_at', 'updated_at')
 
+    def get_search_results(self, request, queryset, search_term):
+        """Email or name prefix, or exact id, each answered from an index"""
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        query = email_prefix_q(search_term) | name_prefix_q(search_term)
+        if search_term.isdigit():
+            query |= Q(id=int(search_term))
+        return queryset.filter(query), False
+
     def get_role_display(self, obj):
         """Display human-readable role name"""
         try:
@@ -118,49 +145,84 @@ class CustomUserAdmin(admin.ModelAdmin):
             form.base_fields['role'].choices = Role.choices()
         return form
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and {'role', 'is_active'} & set(form.changed_data):
+            counters.token_version.bump([obj.id])
+
     def get_fieldsets(self, request, obj=None):
         if not obj:
             return self.add_fieldsets
         return super().get_fieldsets(request, obj)
 
-    actions = ['make_admin', 'make_user', 'activate_users', 'deactivate_users']
+    actions = ['make_admin', 'make_user', 'activate_users', 'deactivate_users',
+               'revoke_tokens', 'logout_everywhere']
 
-    def make_admin(self, request, queryset):
-        """Make selected users administrators"""
-        updated = queryset.update(role=Role.ADMIN.value)
+    def _enqueue(self, request, queryset, action):
+        """Run a mass action as a background job and link to its progress"""
+        job = jobs.enqueue(
+            action, queryset.values_list('id', flat=True), created_by=request.user)
+        url = reverse('admin:users_adminjob_change', args=[job.id])
         self.message_user(
             request,
-            f'{updated} users have become administrators',
+            format_html(
+                '{} users queued for "{}", <a href="{}">follow job #{}</a>',
+                job.total, action.replace('_', ' '), url, job.id
+            ),
             messages.SUCCESS
         )
+
+    def make_admin(self, request, queryset):
+        """Make selected users administrators"""
+        self._enqueue(request, queryset, 'make_admin')
     make_admin.short_description = "Make administrators"
 
     def make_user(self, request, queryset):
         """Make selected users regular users"""
-        updated = queryset.update(role=Role.USER.value)
-        self.message_user(
-            request,
-            f'{updated} users have become regular users',
-            messages.SUCCESS
-        )
+        self._enqueue(request, queryset, 'make_user')
     make_user.short_description = "Make regular users"
 
     def activate_users(self, request, queryset):
         """Activate selected users"""
-        updated = queryset.update(is_active=True)
-        self.message_user(
-            request,
-            f'{updated} users have been activated',
-            messages.SUCCESS
-        )
+        self._enqueue(request, queryset, 'activate_users')
     activate_users.short_description = "Activate users"
 
     def deactivate_users(self, request, queryset):
-        """Deactivate selected users"""
-        updated = queryset.update(is_active=False)
-        self.message_user(
-            request,
-            f'{updated} users have been deactivated',
-            messages.WARNING
-        )
+        """Deactivate selected users and revoke all their tokens"""
+        self._enqueue(request, queryset, 'deactivate_users')
     deactivate_users.short_description = "Deactivate users"
+
+    def revoke_tokens(self, request, queryset):
+        """Blacklist all unexpired tokens of selected users"""
+        self._enqueue(request, queryset, 'revoke_tokens')
+    revoke_tokens.short_description = "Revoke tokens"
+
+    def logout_everywhere(self, request, queryset):
+        """Invalidate every token of selected users"""
+        self._enqueue(request, queryset, 'logout_everywhere')
+    logout_everywhere.short_description = "Log out everywhere"
+
+
+@admin.register(AdminJob)
+class AdminJobAdmin(admin.ModelAdmin):
+    """Progress of background mass actions"""
+
+    list_display = ('id', 'action', 'status', 'get_progress',
+                    'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'action')
+    list_select_related = ('created_by',)
+    exclude = ('user_ids',)
+    readonly_fields = ('action', 'status', 'get_progress', 'total', 'processed',
+                       'error', 'created_by', 'created_at', 'started_at', 'heartbeat_at',
+                       'finished_at')
+
+    def get_progress(self, obj):
+        """Processed users of total"""
+        return f'{obj.processed}/{obj.total} ({obj.progress:.0%})'
+    get_progress.short_description = 'Progress'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -9,3 +9,5 @@ class UsersConfig(AppConfig):
 
     def ready(self):
         import apps.users.admin
+        import apps.users.checks
+        import apps.users.signals  # noqa: F401
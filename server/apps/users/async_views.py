@@ -0,0 +1,147 @@
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, HttpResponseNotAllowed
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+
+from . import encoders, hashing, throttling
+from .backends import LOGIN_FIELDS
+from .hashing import HashingPoolFull
+from .models import User, email_key
+from .renderers import FastJSONRenderer
+from .serializers import CredentialsSerializer, RegisterSerializer
+from .tokens import CustomRefreshToken
+
+_renderer = FastJSONRenderer() if encoders.is_enabled() else JSONRenderer()
+
+
+def async_api_view(view_method):
+    """
+    csrf_exempt + require_POST for async views (Django 4.2 decorators are sync only)
+    """
+    @wraps(view_method)
+    async def wrapped_view(request, *args, **kwargs):
+        if request.method != 'POST':
+            return HttpResponseNotAllowed(['POST'])
+        return await view_method(request, *args, **kwargs)
+
+    wrapped_view.csrf_exempt = True
+    return wrapped_view
+
+
+def _request_data(request):
+    if request.content_type == 'application/json':
+        try:
+            return json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+    return request.POST
+
+
+def _json_response(data, status=status.HTTP_200_OK):
+    """Same bytes as the DRF views render"""
+    return HttpResponse(_renderer.render(data), status=status, content_type='application/json')
+
+
+def _token_pair(user):
+    refresh = CustomRefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+
+def _throttled_response(retry_after):
+    response = _json_response(
+        {'detail': f'Request was throttled. Expected available in {retry_after} seconds.'},
+        status=status.HTTP_429_TOO_MANY_REQUESTS
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def _pool_full_response(exc):
+    response = _json_response(
+        {'error': 'Server is busy, try again later'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response['Retry-After'] = str(exc.retry_after)
+    return response
+
+
+def _malformed_response():
+    return _json_response(
+        {'detail': 'JSON parse error'},
+        status=status.HTTP_400_BAD_REQUEST
+    )
+
+
+@async_api_view
+async def login_view(request):
+    """User authentication with bcrypt offloaded to the hashing pool"""
+    data = _request_data(request)
+    if data is None:
+        return _malformed_response()
+
+    serializer = CredentialsSerializer(data=data)
+    if not serializer.is_valid():
+        return _json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    email = serializer.validated_data['email']
+    password = serializer.validated_data['password']
+
+    retry_after = await throttling.acheck(
+        ('login_ip', throttling.client_ident(request)),
+        ('login_email', email_key(email)),
+    )
+    if retry_after is not None:
+        return _throttled_response(retry_after)
+
+    try:
+        user = await User.objects.by_email(email).only(*LOGIN_FIELDS).afirst()
+        if user is None:
+            valid = await hashing.adummy_verify(password)
+        else:
+            valid = await user.acheck_password(password)
+        if not valid or not user.is_active:
+            return _json_response(
+                {'non_field_errors': ['Unable to log in with provided credentials.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    except HashingPoolFull as e:
+        return _pool_full_response(e)
+
+    return _json_response(await sync_to_async(_token_pair)(user))
+
+
+@async_api_view
+async def register_view(request):
+    """User registration with bcrypt offloaded to the hashing pool"""
+    data = _request_data(request)
+    if data is None:
+        return _malformed_response()
+
+    retry_after = await throttling.acheck(('register_ip', throttling.client_ident(request)))
+    if retry_after is not None:
+        return _throttled_response(retry_after)
+
+    serializer = RegisterSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return _json_response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    user = User(
+        email=User.objects.normalize_email(serializer.validated_data['email']),
+        name=serializer.validated_data['name'],
+    )
+    try:
+        await user.aset_password(serializer.validated_data['password'])
+    except HashingPoolFull as e:
+        return _pool_full_response(e)
+    await user.asave()
+
+    return _json_response(
+        await sync_to_async(_token_pair)(user),
+        status=status.HTTP_201_CREATED
+    )
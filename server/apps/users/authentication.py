@@ -1,12 +1,30 @@
+import hashlib
+import time
+
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
-from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
+from . import counters, revocation
+from .cache import LocalTTLCache
+from .tokens import ROLE_CLAIM, TOKEN_GENERATION_CLAIM, TOKEN_VERSION_CLAIM, ClaimsUser
+
+
+_verification_config = {
+    'ENABLED': True,
+    'MAXSIZE': 10000,
+    **getattr(settings, 'TOKEN_VERIFICATION_CACHE', {}),
+}
+
 
 class CustomJWTAuthentication(JWTAuthentication):
     """Custom JWT authentication with blacklist"""
 
+    # Validated tokens keyed by digest of the raw token, shared by all instances
+    verification_cache = LocalTTLCache(maxsize=_verification_config['MAXSIZE'])
+
     def authenticate(self, request):
         header = self.get_header(request)
         if header is None:
@@ -24,20 +42,136 @@ class CustomJWTAuthentication(JWTAuthentication):
             return self.get_user(validated_token), validated_token
 
         except TokenError as e:
-            raise InvalidToken({
-                'detail': 'Given token not valid for any token type',
-                'code': 'token_not_valid',
-                'messages': [{
-                    'token_class': 'AccessToken',
-                    'token_type': 'access',
-                    'message': str(e)
-                }]
-            })
+            raise self._invalid_token(e)
+
+    def _invalid_token(self, error):
+        return InvalidToken({
+            'detail': 'Given token not valid for any token type',
+            'code': 'token_not_valid',
+            'messages': [{
+                'token_class': 'AccessToken',
+                'token_type': 'access',
+                'message': str(error)
+            }]
+        })
+
+    def get_validated_token(self, raw_token):
+        """Validate token, reusing the result for repeated tokens until they expire"""
+        if not _verification_config['ENABLED']:
+            return super().get_validated_token(raw_token)
+
+        key = hashlib.sha256(raw_token).digest()
+        validated_token = self.verification_cache.get(key)
+        if validated_token is None:
+            validated_token = super().get_validated_token(raw_token)
+            ttl = validated_token.get('exp', 0) - time.time()
+            self.verification_cache.set(key, validated_token, ttl)
+        return validated_token
 
     def _check_blacklist(self, validated_token):
         """Check JWT in blacklist"""
         jti = validated_token.get('jti')
 
         if jti:
-            if BlacklistedToken.objects.filter(token__jti=jti).exists():
+            if revocation.is_revoked(jti, validated_token.get('exp')):
                 raise InvalidToken(_('Token is blacklisted'))
+
+    def get_user(self, validated_token):
+        """Resolve user from token claims in token user mode, otherwise from DB"""
+        generation = validated_token.get(TOKEN_GENERATION_CLAIM)
+
+        if (
+            not getattr(settings, 'TOKEN_USER', {}).get('ENABLED')
+            or ROLE_CLAIM not in validated_token
+            or TOKEN_VERSION_CLAIM not in validated_token
+        ):
+            user = super().get_user(validated_token)
+            if generation is not None and generation != user.token_generation:
+                raise InvalidToken(_('Token has been revoked'))
+            self._check_version(validated_token, user)
+            return user
+
+        user = ClaimsUser(validated_token)
+        if generation is not None and counters.token_generation.get(user.id) != generation:
+            raise InvalidToken(_('Token has been revoked'))
+        if counters.token_version.get(user.id) != user.token_version:
+            raise InvalidToken(_('Token is outdated, refresh it'))
+        return user
+
+    @staticmethod
+    def _check_version(validated_token, user):
+        # Role claims are trusted for authorization, so a token issued
+        # before a role change must be refreshed even on the DB path
+        version = validated_token.get(TOKEN_VERSION_CLAIM)
+        if version is not None and version != user.token_version:
+            raise InvalidToken(_('Token is outdated, refresh it'))
+
+
+class AsyncJWTAuthentication(CustomJWTAuthentication):
+    """
+    CustomJWTAuthentication for async views: revocation and user lookups
+    go through Django's async cache and ORM APIs.
+    """
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        try:
+            validated_token = self.get_validated_token(raw_token)
+
+            await self._acheck_blacklist(validated_token)
+
+            return await self.aget_user(validated_token), validated_token
+
+        except TokenError as e:
+            raise self._invalid_token(e)
+
+    async def _acheck_blacklist(self, validated_token):
+        jti = validated_token.get('jti')
+
+        if jti:
+            if await revocation.ais_revoked(jti, validated_token.get('exp')):
+                raise InvalidToken(_('Token is blacklisted'))
+
+    async def aget_user(self, validated_token):
+        generation = validated_token.get(TOKEN_GENERATION_CLAIM)
+
+        if (
+            not getattr(settings, 'TOKEN_USER', {}).get('ENABLED')
+            or ROLE_CLAIM not in validated_token
+            or TOKEN_VERSION_CLAIM not in validated_token
+        ):
+            user = await self._aget_db_user(validated_token)
+            if generation is not None and generation != user.token_generation:
+                raise InvalidToken(_('Token has been revoked'))
+            self._check_version(validated_token, user)
+            return user
+
+        user = ClaimsUser(validated_token)
+        if generation is not None and await counters.token_generation.aget(user.id) != generation:
+            raise InvalidToken(_('Token has been revoked'))
+        if await counters.token_version.aget(user.id) != user.token_version:
+            raise InvalidToken(_('Token is outdated, refresh it'))
+        return user
+
+    async def _aget_db_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        try:
+            user = await self.user_model.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        return user
@@ -0,0 +1,26 @@
+from django.contrib.auth.backends import ModelBackend
+
+from . import hashing
+from .models import User
+
+# Columns read at login: password check, is_active and the token claims
+LOGIN_FIELDS = ('id', 'password', 'is_active', 'role', 'token_version', 'token_generation')
+
+
+class EmailBackend(ModelBackend):
+    """Case-insensitive email login through the unique normalized email index"""
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        user = User.objects.by_email(username).only(*LOGIN_FIELDS).first()
+        if user is None:
+            # Verify anyway so unknown emails take as long as wrong passwords
+            hashing.dummy_verify(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,85 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+# Backends whose entries are only visible to the process that wrote them
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+# Longest a process-local cache may answer for state other workers can change
+LOCAL_MAX_TIMEOUT = 5
+
+
+def is_shared(alias='default'):
+    """Whether every worker reads and writes the same entries of cache alias"""
+    return settings.CACHES[alias]['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def shared_timeout(timeout, alias='default'):
+    """timeout, capped to LOCAL_MAX_TIMEOUT on process-local backends"""
+    if is_shared(alias):
+        return timeout
+    return min(timeout, LOCAL_MAX_TIMEOUT)
+
+
+class LocalTTLCache:
+    """Bounded in-process LRU cache with per-entry TTL"""
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl):
+        if ttl <= 0:
+            self.delete(key)
+            return
+
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'size': len(self._data),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,129 @@
+import json
+
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Below this many rows an exact COUNT(*) is cheap enough
+EXACT_COUNT_THRESHOLD = 10000
+
+
+def estimated_count(queryset):
+    """
+    Row count of queryset from planner statistics, None when the backend
+    has none (SQLite) or the estimate is small enough to count exactly
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+            estimate = row[0] if row else -1
+        else:
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = plan[0]['Plan']['Plan Rows']
+
+    # reltuples is -1 for never analyzed tables
+    if estimate < EXACT_COUNT_THRESHOLD:
+        return None
+    return int(estimate)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never runs COUNT(*) over large tables"""
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        return estimate if estimate is not None else super().count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist paging with ?after=<value> on a unique ordering column,
+    so any page is an index range scan instead of OFFSET
+    """
+    cursor_param = 'after'
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(self.cursor_param, None)
+        return lookup_params
+
+    def get_query_string(self, new_params=None, remove=None):
+        # Sorting, filtering and searching start from the first page again
+        new_params = {self.cursor_param: None, **(new_params or {})}
+        return super().get_query_string(new_params, remove)
+
+    def _keyset_field(self):
+        """Single unique ordering column, e.g. '-id', or None"""
+        pk_name = self.lookup_opts.pk.name
+        ordering = []
+        for name in self.queryset.query.order_by:
+            if not isinstance(name, str):
+                return None
+            name = name.replace('pk', pk_name) if name.lstrip('-') == 'pk' else name
+            if name not in ordering:
+                ordering.append(name)
+        if len(ordering) != 1:
+            return None
+        try:
+            field = self.lookup_opts.get_field(ordering[0].lstrip('-'))
+        except FieldDoesNotExist:
+            return None
+        return ordering[0] if field.unique else None
+
+    def get_results(self, request):
+        ordering = self._keyset_field()
+        if ordering is None:
+            # Sorted by a non unique column: regular OFFSET pages
+            self.next_url = self.first_url = None
+            return super().get_results(request)
+
+        field = ordering.lstrip('-')
+        queryset = self.queryset
+        after = self.params.get(self.cursor_param)
+        if after:
+            lookup = f'{field}__lt' if ordering.startswith('-') else f'{field}__gt'
+            queryset = queryset.filter(**{lookup: after})
+        rows = list(queryset[:self.list_per_page + 1])
+
+        self.paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.full_result_count = (
+            self.root_queryset.count() if self.show_full_result_count else None)
+        self.show_admin_actions = not self.show_full_result_count or bool(
+            self.full_result_count)
+        self.result_list = rows[:self.list_per_page]
+        self.can_show_all = False
+        self.multi_page = len(rows) > self.list_per_page or bool(after)
+
+        self.next_url = None
+        if len(rows) > self.list_per_page:
+            self.next_url = self.get_query_string({
+                self.cursor_param: getattr(self.result_list[-1], field)})
+        self.first_url = self.get_query_string() if after else None
+
+
+class LargeTableAdminMixin:
+    """ModelAdmin settings for tables too large to count or OFFSET through"""
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    change_list_template = 'admin/keyset_change_list.html'
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+from .cache import is_shared
+
+
+@register(Tags.caches)
+def shared_cache_check(app_configs, **kwargs):
+    """Cross-worker state needs a cache every worker can see"""
+    workers = getattr(settings, 'WEB_CONCURRENCY', 1)
+    if workers <= 1 or is_shared():
+        return []
+    return [
+        Warning(
+            f"WEB_CONCURRENCY is {workers} but CACHES['default'] uses "
+            f"{settings.CACHES['default']['BACKEND']}, which is private to each process.",
+            hint=(
+                'Revocations, token counters and auth throttle budgets are not shared '
+                'between workers and the notes response cache serves stale responses. '
+                'Set CACHE_BACKEND to Redis, Memcached or the database cache.'
+            ),
+            id='users.W001',
+        )
+    ]
@@ -0,0 +1,83 @@
+from django.contrib import messages
+from django.http import HttpResponseRedirect
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class ConcurrentUpdate(Exception):
+    """Row was changed by someone else since the instance was loaded"""
+
+
+class ConflictError(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The resource was modified concurrently, reload it and retry.'
+    default_code = 'conflict'
+
+
+class VersionedModelMixin:
+    """
+    Saves existing rows with compare-and-swap on the version column:
+    UPDATE ... SET version = version + 1 WHERE id = ? AND version = ?
+    """
+
+    def save(self, *args, **kwargs):
+        self._stale_version = False
+        super().save(*args, **kwargs)
+        # Raised outside save_base, which would mark an enclosing atomic block
+        # for rollback and break every later query of the transaction
+        if self._stale_version:
+            raise ConcurrentUpdate(f'{self._meta.label} {self.pk} version {self.version} is stale')
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update):
+        version_field = self._meta.get_field('version')
+        values = [value for value in values if value[0] is not version_field]
+        values.append((version_field, None, self.version + 1))
+
+        filtered = base_qs.filter(pk=pk_val)
+        if filtered.filter(version=self.version)._update(values):
+            self.version += 1
+            return True
+        if filtered.exists():
+            # Report the row as saved so save_base neither inserts nor fails
+            self._stale_version = True
+            return True
+        return False
+
+
+def auto_now_fields(instance):
+    """Names of auto_now fields that must be part of every update_fields"""
+    return [
+        field.name for field in instance._meta.concrete_fields
+        if getattr(field, 'auto_now', False)
+    ]
+
+
+class VersionedUpdateMixin:
+    """
+    ModelSerializer update that writes only validated fields, checked against
+    the version sent by the client or, without one, the version loaded
+    """
+
+    def update(self, instance, validated_data):
+        expected = validated_data.pop('version', None)
+        if expected is not None:
+            instance.version = expected
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        try:
+            instance.save(update_fields=[*validated_data, *auto_now_fields(instance)])
+        except ConcurrentUpdate:
+            raise ConflictError()
+        return instance
+
+
+class VersionedAdminMixin:
+    """ModelAdmin reporting stale versions as an error message instead of a 500"""
+
+    def changeform_view(self, request, *args, **kwargs):
+        try:
+            return super().changeform_view(request, *args, **kwargs)
+        except ConcurrentUpdate:
+            # The admin's atomic block has rolled back the save and related objects
+            self.message_user(request, ConflictError.default_detail, messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
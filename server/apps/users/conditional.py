@@ -0,0 +1,53 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+CONDITIONAL_HEADERS = (
+    'HTTP_IF_MATCH',
+    'HTTP_IF_NONE_MATCH',
+    'HTTP_IF_MODIFIED_SINCE',
+    'HTTP_IF_UNMODIFIED_SINCE',
+)
+
+
+def is_conditional(request):
+    return any(header in request.META for header in CONDITIONAL_HEADERS)
+
+
+def object_validators(pk, updated_at):
+    """ETag and Last-Modified timestamp of a single row"""
+    return (
+        quote_etag(f'{pk}-{int(updated_at.timestamp() * 1000000)}'),
+        int(updated_at.timestamp()),
+    )
+
+
+def list_validators(request, version, changed_at):
+    """
+    ETag and Last-Modified timestamp of a collection page, from a counter
+    and time moved by every write to the collection, removals included
+    """
+    if changed_at is None:
+        return quote_etag(f'empty-{request.GET.urlencode()}'), None
+
+    params = hashlib.sha256(request.GET.urlencode().encode('utf-8')).hexdigest()[:16]
+    return (
+        quote_etag(f'{version}-{int(changed_at.timestamp() * 1000000)}-{params}'),
+        int(changed_at.timestamp()),
+    )
+
+
+def precondition_response(request, etag, last_modified):
+    """304/412 response when request preconditions say so, otherwise None"""
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    return response
@@ -0,0 +1,74 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, QuerySet
+
+from .cache import shared_timeout
+from .models import User
+
+
+class UserCounter:
+    """Per-user integer column mirrored in Django's cache for the auth hot path"""
+
+    def __init__(self, field, timeout=300):
+        self.field = field
+        self.timeout = timeout
+
+    def _key(self, user_id):
+        return f'users:{self.field}:{user_id}'
+
+    def get(self, user_id):
+        """Current value, or None if user does not exist"""
+        key = self._key(user_id)
+        value = cache.get(key)
+        if value is None:
+            value = User.objects.filter(id=user_id).values_list(
+                self.field, flat=True).first()
+            if value is not None:
+                cache.set(key, value, timeout=shared_timeout(self.timeout))
+        return value
+
+    async def aget(self, user_id):
+        """Async variant of get"""
+        key = self._key(user_id)
+        value = await cache.aget(key)
+        if value is None:
+            value = await User.objects.filter(id=user_id).values_list(
+                self.field, flat=True).afirst()
+            if value is not None:
+                await cache.aset(key, value, timeout=shared_timeout(self.timeout))
+        return value
+
+    def bump(self, users, **fields):
+        """
+        Increment counter (and apply optional field updates) in a single UPDATE.
+        Accepts a User queryset or a list of user ids.
+        """
+        if isinstance(users, QuerySet):
+            user_ids = list(users.values_list('id', flat=True))
+        else:
+            user_ids = list(users)
+        if not user_ids:
+            return 0
+        if fields:
+            # Field updates invalidate versions held by optimistic writers
+            fields['version'] = F('version') + 1
+        fields[self.field] = F(self.field) + 1
+        updated = User.objects.filter(id__in=user_ids).update(**fields)
+        self.forget(user_ids)
+        return updated
+
+    def forget(self, user_ids):
+        """Drop cached values once the current transaction commits"""
+        keys = [self._key(user_id) for user_id in user_ids]
+        # Deleting earlier lets a concurrent read cache the old value again
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+_config = getattr(settings, 'TOKEN_USER', {})
+
+token_version = UserCounter(
+    'token_version', timeout=_config.get('VERSION_CACHE_TIMEOUT', 300))
+
+token_generation = UserCounter(
+    'token_generation', timeout=_config.get('VERSION_CACHE_TIMEOUT', 300))
@@ -4,12 +4,16 @@ from rest_framework import status
 
 
 from apps.users.enums import Role
+from apps.users.permissions import has_role, role_mask
 
 
 def require_roles(*required_roles):
     """
     Decorator for APIView methods that checks roles AFTER DRF authentication
     """
+    mask = role_mask(*required_roles)
+    role_names = [Role(role).name for role in required_roles]
+
     def decorator(view_method):
         @wraps(view_method)
         def wrapped_view(self, request, *args, **kwargs):
@@ -22,20 +26,11 @@ def require_roles(*required_roles):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
 
-            user_role = None
-            if hasattr(request.user, 'get_role'):
-                user_role = request.user.get_role()
-            elif hasattr(request.user, 'role'):
-                try:
-                    user_role = Role(request.user.role)
-                except (ValueError, TypeError):
-                    user_role = None
-
-            if user_role is None or user_role not in required_roles:
+            if not has_role(request, mask):
                 return JsonResponse(
                     {
                         'error': 'PERMISSION_DENIED',
-                        'message': f'Insufficient permissions. Required roles: {[r.name for r in required_roles]}'
+                        'message': f'Insufficient permissions. Required roles: {role_names}'
                     },
                     status=status.HTTP_403_FORBIDDEN
                 )
@@ -0,0 +1,88 @@
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import ISO_8601, fields as drf_fields
+from rest_framework.settings import api_settings
+
+# Fields whose to_representation returns database values unchanged
+_PASSTHROUGH_FIELDS = (
+    drf_fields.BooleanField,
+    drf_fields.CharField,
+    drf_fields.ChoiceField,
+    drf_fields.IntegerField,
+    drf_fields.ReadOnlyField,
+)
+
+
+def is_enabled():
+    return getattr(settings, 'FAST_SERIALIZATION', {}).get('ENABLED', False)
+
+
+def format_datetime(value, tz=None):
+    """Same string DRF DateTimeField renders with the default ISO 8601 format"""
+    if settings.USE_TZ and timezone.is_aware(value):
+        value = value.astimezone(tz or timezone.get_current_timezone())
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+class RowEncoder:
+    """
+    Encodes .values() rows to the representation of a serializer without
+    building model instances or walking serializer fields per row
+    """
+
+    def __init__(self, serializer_class, field_names=None, aliases=None):
+        serializer_fields = serializer_class().fields
+        aliases = dict(aliases or ())
+        self.plan = []
+        self.fields = []
+        for name, field in serializer_fields.items():
+            if field.write_only or (field_names is not None and name not in field_names):
+                continue
+            if name in aliases:
+                # Value comes from a .values() expression named alias
+                self.plan.append((name, aliases[name], self._kind(field)))
+                continue
+            if '.' in field.source or field.source == '*':
+                raise ValueError(f'{serializer_class.__name__}.{name} is not a model column')
+            self.plan.append((name, field.source, self._kind(field)))
+            self.fields.append(field.source)
+        self.fields = tuple(self.fields)
+
+    @staticmethod
+    def _kind(field):
+        if isinstance(field, drf_fields.DateTimeField):
+            output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+            if output_format == ISO_8601 and not hasattr(field, 'timezone'):
+                return 'datetime'
+        elif isinstance(field, _PASSTHROUGH_FIELDS) and not isinstance(
+            field, (drf_fields.MultipleChoiceField, drf_fields.FilePathField)
+        ):
+            return None
+        return field.to_representation
+
+    def iter_encode(self, rows):
+        tz = timezone.get_current_timezone()
+        plan = [
+            (name, source, (lambda value: format_datetime(value, tz)) if kind == 'datetime' else kind)
+            for name, source, kind in self.plan
+        ]
+        for row in rows:
+            yield {
+                name: row[source] if convert is None or row[source] is None
+                else convert(row[source])
+                for name, source, convert in plan
+            }
+
+    def encode(self, rows):
+        return list(self.iter_encode(rows))
+
+
+@lru_cache(maxsize=None)
+def row_encoder(serializer_class, field_names=None, aliases=None):
+    """RowEncoder of serializer_class, built once per process and field subset"""
+    return RowEncoder(serializer_class, field_names, aliases)
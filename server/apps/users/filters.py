@@ -0,0 +1,39 @@
+import django_filters
+from django.db.models import Q
+
+from .enums import Role
+from .models import User, email_key
+
+
+def email_prefix_q(prefix, field='email_normalized'):
+    """
+    Case-insensitive email prefix on the normalized email as LIKE 'prefix%',
+    answered from the pattern_ops index Django creates for the unique column
+    on PostgreSQL and from users_email_prefix_idx on SQLite
+    """
+    return Q(**{f'{field}__startswith': email_key(prefix)})
+
+
+def name_prefix_q(prefix, field='name'):
+    """Case-insensitive name prefix, answered from users_name_prefix_idx"""
+    return Q(**{f'{field}__istartswith': prefix})
+
+
+class UserFilter(django_filters.FilterSet):
+    """Filters of the user list, each one answered from an index on users"""
+    role = django_filters.TypedChoiceFilter(choices=Role.choices(), coerce=int)
+    is_active = django_filters.BooleanFilter(method='filter_is_active')
+    created_at = django_filters.IsoDateTimeFromToRangeFilter()
+    email = django_filters.CharFilter(method='filter_email_prefix')
+
+    class Meta:
+        model = User
+        fields = ('role', 'is_active', 'created_at', 'email')
+
+    def filter_email_prefix(self, queryset, name, value):
+        return queryset.filter(email_prefix_q(value))
+
+    def filter_is_active(self, queryset, name, value):
+        # is_active=True compiles to a bare column test that SQLite can not
+        # match to users_active_created_id_idx, IN (?) can
+        return queryset.filter(is_active__in=[value])
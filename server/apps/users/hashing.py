@@ -0,0 +1,107 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from django.conf import settings
+
+
+class HashingPoolFull(Exception):
+    """Raised when the password hashing queue is saturated"""
+
+    def __init__(self, retry_after):
+        super().__init__('Password hashing queue is full')
+        self.retry_after = retry_after
+
+
+def hash_password(raw_password):
+    salt = bcrypt.gensalt()
+    return bcrypt.hashpw(raw_password.encode('utf-8'), salt).decode('utf-8')
+
+
+def verify_password(raw_password, hashed_password):
+    return bcrypt.checkpw(
+        raw_password.encode('utf-8'),
+        hashed_password.encode('utf-8')
+    )
+
+
+_dummy_hash = None
+
+
+def _get_dummy_hash():
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = hash_password('dummy password')
+    return _dummy_hash
+
+
+def dummy_verify(raw_password):
+    """Same bcrypt cost as checking a real password, for unknown users"""
+    verify_password(raw_password, _get_dummy_hash())
+    return False
+
+
+def _config():
+    return {
+        'MAX_WORKERS': os.cpu_count() or 1,
+        'MAX_QUEUE': 32,
+        'RETRY_AFTER': 1,
+        **getattr(settings, 'PASSWORD_HASHING_POOL', {}),
+    }
+
+
+_executor = None
+_pending = 0
+_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=_config()['MAX_WORKERS'],
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+async def _submit(func, *args):
+    """Run func in the process pool, rejecting work beyond workers + queue size"""
+    global _pending
+    config = _config()
+
+    with _lock:
+        if _pending >= config['MAX_WORKERS'] + config['MAX_QUEUE']:
+            raise HashingPoolFull(config['RETRY_AFTER'])
+        _pending += 1
+        executor = _get_executor()
+
+    try:
+        return await asyncio.wrap_future(executor.submit(func, *args))
+    finally:
+        with _lock:
+            _pending -= 1
+
+
+async def ahash_password(raw_password):
+    return await _submit(hash_password, raw_password)
+
+
+async def averify_password(raw_password, hashed_password):
+    return await _submit(verify_password, raw_password, hashed_password)
+
+
+async def _aget_dummy_hash():
+    # Hashed in the pool so the first unknown user does not block the event loop
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await _submit(hash_password, 'dummy password')
+    return _dummy_hash
+
+
+async def adummy_verify(raw_password):
+    await _submit(verify_password, raw_password, await _aget_dummy_hash())
+    return False
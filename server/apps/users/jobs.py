@@ -0,0 +1,176 @@
+import logging
+import queue
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from . import counters, revocation
+from .enums import Role
+from .models import AdminJob
+
+logger = logging.getLogger(__name__)
+
+
+def _config():
+    return {
+        'BATCH_SIZE': 1000,
+        'SLEEP': 0.0,
+        'STALE_AFTER': 300,
+        **getattr(settings, 'ADMIN_JOBS', {}),
+    }
+
+
+def _set_role(role):
+    def action(user_ids):
+        counters.token_version.bump(user_ids, role=role)
+    return action
+
+
+def _activate(user_ids):
+    counters.token_version.bump(user_ids, is_active=True)
+
+
+def _deactivate(user_ids):
+    # Generation bump revokes every access and refresh token in the same UPDATE
+    counters.token_version.bump(
+        user_ids, is_active=False, token_generation=F('token_generation') + 1)
+    counters.token_generation.forget(user_ids)
+
+
+def _logout_everywhere(user_ids):
+    counters.token_generation.bump(user_ids)
+
+
+def _revoke_tokens(user_ids):
+    outstanding = list(OutstandingToken.objects.filter(
+        user_id__in=user_ids,
+        expires_at__gt=timezone.now(),
+        blacklistedtoken__isnull=True,
+    ).values_list('id', 'jti', 'expires_at'))
+    BlacklistedToken.objects.bulk_create(
+        [BlacklistedToken(token_id=token_id) for token_id, _jti, _expires_at in outstanding],
+        ignore_conflicts=True,
+    )
+    # bulk_create skips post_save, so populate revocation cache here
+    for _token_id, jti, expires_at in outstanding:
+        revocation.mark_revoked(jti, expires_at)
+
+
+ACTIONS = {
+    'make_admin': _set_role(Role.ADMIN.value),
+    'make_user': _set_role(Role.USER.value),
+    'activate_users': _activate,
+    'deactivate_users': _deactivate,
+    'logout_everywhere': _logout_everywhere,
+    'revoke_tokens': _revoke_tokens,
+}
+
+
+def run_job(job_id):
+    """Run a pending job batch by batch, resuming after the processed users"""
+    now = timezone.now()
+    claimed = AdminJob.objects.filter(id=job_id, status=AdminJob.Status.PENDING).update(
+        status=AdminJob.Status.RUNNING, started_at=now, heartbeat_at=now)
+    if not claimed:
+        return None
+
+    config = _config()
+    job = AdminJob.objects.get(id=job_id)
+    try:
+        action = ACTIONS[job.action]
+        for start in range(job.processed, job.total, config['BATCH_SIZE']):
+            batch = job.user_ids[start:start + config['BATCH_SIZE']]
+            with transaction.atomic():
+                action(batch)
+                AdminJob.objects.filter(id=job_id).update(
+                    processed=start + len(batch), heartbeat_at=timezone.now())
+            if config['SLEEP']:
+                time.sleep(config['SLEEP'])
+    except Exception as e:
+        logger.exception('Admin job %s failed', job_id)
+        AdminJob.objects.filter(id=job_id).update(
+            status=AdminJob.Status.FAILED, error=str(e), finished_at=timezone.now())
+    else:
+        AdminJob.objects.filter(id=job_id).update(
+            status=AdminJob.Status.DONE, finished_at=timezone.now())
+    job.refresh_from_db()
+    return job
+
+
+_queue = queue.Queue()
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def requeue_stale_jobs():
+    """
+    Return running jobs whose worker stopped sending heartbeats to pending
+    and queue every pending job. Batches commit together with `processed`,
+    so a resumed job continues after the last finished batch.
+    """
+    cutoff = timezone.now() - timedelta(seconds=_config()['STALE_AFTER'])
+    stale = AdminJob.objects.filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True),
+        status=AdminJob.Status.RUNNING,
+    ).update(status=AdminJob.Status.PENDING)
+    if stale:
+        logger.warning('Resuming %s stale admin jobs', stale)
+    # Jobs queued twice are skipped by the claim in run_job
+    for job_id in AdminJob.objects.filter(
+        status=AdminJob.Status.PENDING
+    ).order_by('id').values_list('id', flat=True):
+        _queue.put(job_id)
+
+
+def _work_forever():
+    # Jobs left pending or running by a previous process
+    requeue_stale_jobs()
+    close_old_connections()
+
+    while True:
+        try:
+            job_id = _queue.get(timeout=_config()['STALE_AFTER'])
+        except queue.Empty:
+            # Pick up jobs of workers that died while this one was idle
+            try:
+                requeue_stale_jobs()
+            except Exception:
+                logger.exception('Stale admin jobs could not be requeued')
+            finally:
+                close_old_connections()
+            continue
+        try:
+            run_job(job_id)
+        except Exception:
+            logger.exception('Admin job %s could not be started', job_id)
+        finally:
+            close_old_connections()
+
+
+def start_worker():
+    """Start the job worker thread once per process"""
+    global _thread
+    if _thread is not None:
+        return
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(target=_work_forever, name='admin-jobs', daemon=True)
+            _thread.start()
+
+
+def enqueue(action, user_ids, created_by=None):
+    """Create a job for user_ids and hand it to the worker once committed"""
+    if action not in ACTIONS:
+        raise ValueError(f'Unknown admin job action: {action}')
+    user_ids = sorted(set(user_ids))
+    job = AdminJob.objects.create(
+        action=action, user_ids=user_ids, total=len(user_ids), created_by=created_by)
+    start_worker()
+    transaction.on_commit(lambda: _queue.put(job.id))
+    return job
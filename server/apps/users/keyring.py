@@ -0,0 +1,144 @@
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import jwt
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from rest_framework_simplejwt.settings import api_settings
+
+ASYMMETRIC_ALGORITHMS = {'RS256', 'RS384', 'RS512', 'EdDSA'}
+
+
+def _config():
+    return {
+        'ALGORITHM': api_settings.ALGORITHM,
+        'KEYS_DIR': '',
+        'SIGNING_KID': '',
+        'JWKS_MAX_AGE': 3600,
+        **getattr(settings, 'JWT_KEYRING', {}),
+    }
+
+
+class KeyRing:
+    """
+    Signing key and verification keys indexed by kid, loaded from a directory:
+    <kid>.pem is a private key, <kid>.pub.pem a public key.
+    Keys which only have a public part stay valid for verification during rotation.
+    """
+
+    def __init__(self, algorithm, keys_dir='', signing_kid=''):
+        self.algorithm = algorithm
+        self.signing_kid = signing_kid or None
+        self.signing_key = None
+        self.verifying_keys = {}
+
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            return
+
+        from cryptography.hazmat.primitives import serialization
+
+        keys_dir = Path(keys_dir)
+        for path in sorted(keys_dir.glob('*.pub.pem')):
+            kid = path.name[:-len('.pub.pem')]
+            self.verifying_keys[kid] = serialization.load_pem_public_key(path.read_bytes())
+
+        if self.signing_kid:
+            private_path = keys_dir / f'{self.signing_kid}.pem'
+            self.signing_key = serialization.load_pem_private_key(
+                private_path.read_bytes(), password=None)
+            self.verifying_keys.setdefault(self.signing_kid, self.signing_key.public_key())
+
+    @property
+    def is_asymmetric(self):
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    def jwks(self):
+        """JSON Web Key Set with all verification keys"""
+        keys = []
+        for kid, key in self.verifying_keys.items():
+            algorithm = jwt.get_algorithm_by_name(self.algorithm)
+            jwk = json.loads(algorithm.to_jwk(key))
+            jwk.update({'kid': kid, 'alg': self.algorithm, 'use': 'sig'})
+            keys.append(jwk)
+        return {'keys': keys}
+
+
+class KeyRingTokenBackend(TokenBackend):
+    """Token backend signing with the active kid and verifying with any key of the ring"""
+
+    def __init__(self, keyring, **kwargs):
+        self.keyring = keyring
+        super().__init__(keyring.algorithm, **kwargs)
+        if keyring.is_asymmetric:
+            self.signing_key = keyring.signing_key
+
+    def _validate_algorithm(self, algorithm):
+        if algorithm == 'EdDSA':
+            if not jwt.algorithms.has_crypto:
+                raise TokenBackendError(_('You must have cryptography installed to use EdDSA.'))
+            return
+        super()._validate_algorithm(algorithm)
+
+    def encode(self, payload):
+        if not self.keyring.is_asymmetric:
+            return super().encode(payload)
+
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload['aud'] = self.audience
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+
+        return jwt.encode(
+            jwt_payload,
+            self.signing_key,
+            algorithm=self.algorithm,
+            headers={'kid': self.keyring.signing_kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def get_verifying_key(self, token):
+        if not self.keyring.is_asymmetric:
+            return super().get_verifying_key(token)
+
+        kid = jwt.get_unverified_header(token).get('kid')
+        try:
+            return self.keyring.verifying_keys[kid]
+        except KeyError:
+            raise TokenBackendError(_('Token is invalid or expired'))
+
+
+@lru_cache(maxsize=None)
+def get_keyring():
+    config = _config()
+    return KeyRing(config['ALGORITHM'], config['KEYS_DIR'], config['SIGNING_KID'])
+
+
+@lru_cache(maxsize=None)
+def get_token_backend():
+    keyring = get_keyring()
+    signing_key = None if keyring.is_asymmetric else api_settings.SIGNING_KEY
+    return KeyRingTokenBackend(
+        keyring,
+        signing_key=signing_key,
+        verifying_key=api_settings.VERIFYING_KEY,
+        audience=api_settings.AUDIENCE,
+        issuer=api_settings.ISSUER,
+        leeway=api_settings.LEEWAY,
+        json_encoder=api_settings.JSON_ENCODER,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_jwks():
+    """Serialized JWKS document and its ETag"""
+    body = json.dumps(get_keyring().jwks(), sort_keys=True, separators=(',', ':'))
+    return body, '"%s"' % hashlib.sha256(body.encode('utf-8')).hexdigest()[:32]
+
+
+def jwks_max_age():
+    return _config()['JWKS_MAX_AGE']
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from apps.notes.models import Note
+from apps.notes.serializers import NoteSerializer
+from apps.users import encoders
+from apps.users.models import User
+from apps.users.renderers import FastJSONRenderer
+from apps.users.serializers import UserListSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compares rows/sec of ModelSerializer rendering and the .values() fast path'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=10000,
+            help='Rows read per run'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=3,
+            help='Runs per path, the best one is reported'
+        )
+
+    def handle(self, *args, **options):
+        for key, model, serializer_class in (
+            ('notes', Note, NoteSerializer),
+            ('users', User, UserListSerializer),
+        ):
+            queryset = model.objects.order_by('id')[:options['rows']]
+            encoder = encoders.row_encoder(serializer_class)
+
+            def serializer_path():
+                data = serializer_class(queryset, many=True).data
+                return JSONRenderer().render({key: data})
+
+            def fast_path():
+                data = encoder.encode(queryset.values(*encoder.fields))
+                return FastJSONRenderer().render({key: data})
+
+            rows = queryset.count()
+            if not rows:
+                self.stdout.write(f'{key}: no rows, run create_test_data first')
+                continue
+            before = self._measure(serializer_path, options['repeat'])
+            after = self._measure(fast_path, options['repeat'])
+            if serializer_path() != fast_path():
+                raise CommandError(f'{key}: fast path output differs from serializer output')
+
+            self.stdout.write(
+                f'{key}: {rows} rows, '
+                f'serializer {rows / before:.0f} rows/sec, '
+                f'fast path {rows / after:.0f} rows/sec ({before / after:.1f}x)'
+            )
+
+    @staticmethod
+    def _measure(path, repeat):
+        best = None
+        for _ in range(max(repeat, 1)):
+            started = time.perf_counter()
+            path()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
@@ -1,13 +1,30 @@
-from django.core.management.base import BaseCommand
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
 from django.contrib.auth import get_user_model
+from apps.users import hashing
 from apps.users.enums import Role
-from apps.notes.models import Note
-import bcrypt
+from apps.users.models import email_key
+from apps.notes.models import Note, NotesVersion
+
+LOADTEST_DOMAIN = 'loadtest.example.com'
+
+WORDS = (
+    'alpha', 'backup', 'budget', 'call', 'client', 'coffee', 'deadline', 'deploy',
+    'design', 'draft', 'email', 'feature', 'fix', 'groceries', 'idea', 'invoice',
+    'meeting', 'migration', 'notes', 'plan', 'project', 'query', 'recipe', 'release',
+    'report', 'review', 'schedule', 'server', 'sprint', 'task', 'ticket', 'travel',
+    'update', 'vacation', 'weekly', 'workout',
+)
 
 
 class Command(BaseCommand):
-    help = 'Creates test users and notes using transaction'
+    help = (
+        'Creates demo users and notes, and with --users a deterministic '
+        'synthetic dataset for load testing'
+    )
 
     def add_arguments(self, parser):
         parser.add_argument(
@@ -15,6 +32,43 @@ class Command(BaseCommand):
             action='store_true',
             help='Delete existing test users before creating'
         )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=0,
+            help=f'Synthetic users to create, emails user<N>@{LOADTEST_DOMAIN}'
+        )
+        parser.add_argument(
+            '--notes-per-user',
+            type=int,
+            default=10,
+            help='Notes created for every synthetic user'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Random seed, the same seed produces the same dataset'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Rows per bulk INSERT transaction'
+        )
+        parser.add_argument(
+            '--password',
+            default='LoadTest123!',
+            help='Password of every synthetic user, hashed once'
+        )
+        parser.add_argument(
+            '--text-sizes',
+            default='64:60,512:30,4096:9,32768:1',
+            help=(
+                'Note description length distribution as MAX_LENGTH:WEIGHT pairs, '
+                'lengths are uniform between the previous and this MAX_LENGTH'
+            )
+        )
 
     def handle(self, *args, **options):
         User = get_user_model()
@@ -29,7 +83,8 @@ class Command(BaseCommand):
                     {'name': 'Important tasks',
                         'description': '1. Check system security\n2. Update servers\n3. Conduct audit'},
                     {'name': 'Weekly meetings',
-                        'description': 'Monday: standup\nWednesday: meeting with developers\nFriday: report to management'},
+                        'description': 'Monday: standup\nWednesday: meeting with developers\n'
+                                       'Friday: report to management'},
                 ]
             },
             {
@@ -50,9 +105,12 @@ class Command(BaseCommand):
                 'password': 'MariaPass123!',
                 'role': Role.USER,
                 'notes': [
-                    {'name': 'Recipes', 'description': 'Spaghetti carbonara:\n- pasta 400g\n- bacon 200g\n- eggs 3pcs\n- parmesan 100g'},
+                    {'name': 'Recipes',
+                        'description': 'Spaghetti carbonara:\n- pasta 400g\n- bacon 200g\n'
+                                       '- eggs 3pcs\n- parmesan 100g'},
                     {'name': 'Books to read',
-                        'description': '1. "Clean Code" Robert Martin\n2. "Design Patterns" GoF\n3. "The Pragmatic Programmer"'},
+                        'description': '1. "Clean Code" Robert Martin\n2. "Design Patterns" GoF\n'
+                                       '3. "The Pragmatic Programmer"'},
                 ]
             }
         ]
@@ -63,9 +121,14 @@ class Command(BaseCommand):
                     self._clean_test_data(User)
 
                 created_users = []
+                password_hashes = {
+                    password: hashing.hash_password(password)
+                    for password in {user_data['password'] for user_data in test_users}
+                }
 
                 for user_data in test_users:
-                    user = self._create_or_update_user(User, user_data)
+                    user = self._create_or_update_user(
+                        User, user_data, password_hashes[user_data['password']])
                     created_users.append(user)
 
                     self._create_user_notes(user, user_data['notes'])
@@ -83,6 +146,9 @@ class Command(BaseCommand):
             )
             raise
 
+        if options['users'] > 0:
+            self._create_synthetic_data(User, options)
+
     def _clean_test_data(self, User):
         """Clean test data"""
         emails_to_delete = ['admin@example.com',
@@ -93,39 +159,37 @@ class Command(BaseCommand):
 
         Note.objects.filter(user__email__in=emails_to_delete).delete()
 
+        # Notes first as one DELETE, cascading from users would load every note
+        loadtest_users = User.objects.filter(email_normalized__endswith=f'@{LOADTEST_DOMAIN}')
+        Note.objects.filter(user__in=loadtest_users).delete()
+        users_deleted += loadtest_users.delete()[0]
+
         self.stdout.write(
             self.style.WARNING(f'🗑️ Deleted {users_deleted} test records')
         )
 
-    def _create_or_update_user(self, User, user_data):
+    def _create_or_update_user(self, User, user_data, password_hash):
         """Create or update user"""
         email = user_data['email']
 
-        if User.objects.filter(email=email).exists():
-            user = User.objects.get(email=email)
+        user = User.objects.by_email(email).first()
+        if user is not None:
             user.name = user_data['name']
             user.role = user_data['role'].value
             user.is_active = True
 
             if user_data.get('update_password', True):
-                salt = bcrypt.gensalt()
-                hashed_password = bcrypt.hashpw(
-                    user_data['password'].encode('utf-8'), salt)
-                user.password = hashed_password.decode('utf-8')
+                user.password = password_hash
 
             user.save()
             self.stdout.write(
                 self.style.WARNING(f'🔄 Updated user: {user.email}')
             )
         else:
-            salt = bcrypt.gensalt()
-            hashed_password = bcrypt.hashpw(
-                user_data['password'].encode('utf-8'), salt)
-
             user = User.objects.create(
                 name=user_data['name'],
                 email=email,
-                password=hashed_password.decode('utf-8'),
+                password=password_hash,
                 role=user_data['role'].value,
                 is_active=True
             )
@@ -137,17 +201,22 @@ class Command(BaseCommand):
 
     def _create_user_notes(self, user, notes_data):
         """Create notes for user"""
-        for note_data in notes_data:
-            if not Note.objects.filter(user=user, name=note_data['name']).exists():
-                Note.objects.create(
-                    user=user,
-                    name=note_data['name'],
-                    description=note_data['description']
-                )
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'   📝 Created note: "{note_data["name"]}"')
-                )
+        existing = set(Note.objects.filter(
+            user=user, name__in=[note_data['name'] for note_data in notes_data]
+        ).values_list('name', flat=True))
+        missing = [
+            note_data for note_data in notes_data if note_data['name'] not in existing]
+        Note.objects.bulk_create([
+            Note(user=user, name=note_data['name'], description=note_data['description'])
+            for note_data in missing
+        ])
+        if missing:
+            NotesVersion.objects.bump([user.id])
+        for note_data in missing:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'   📝 Created note: "{note_data["name"]}"')
+            )
 
     def _print_summary(self, users):
         """Print summary of created data"""
@@ -182,3 +251,119 @@ class Command(BaseCommand):
             self.stdout.write(f"\n{role}")
             self.stdout.write(f"Login: {user.email}")
             self.stdout.write(f"Password: {password}")
+
+    @staticmethod
+    def _parse_text_sizes(value):
+        """'64:60,512:30' as sorted [(min_length, max_length, weight)]"""
+        try:
+            pairs = sorted(
+                (int(size), float(weight))
+                for size, weight in (item.split(':') for item in value.split(','))
+            )
+        except ValueError:
+            raise CommandError(f'Invalid --text-sizes: {value}')
+        if (
+            not pairs or any(size < 0 or weight < 0 for size, weight in pairs)
+            or not sum(weight for _size, weight in pairs)
+        ):
+            raise CommandError(f'Invalid --text-sizes: {value}')
+        buckets, low = [], 0
+        for size, weight in pairs:
+            buckets.append((low, size, weight))
+            low = size
+        return buckets
+
+    def _create_synthetic_data(self, User, options):
+        """Bulk insert users and notes generated from --seed"""
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be at least 1')
+        if options['notes_per_user'] < 0:
+            raise CommandError('--notes-per-user must not be negative')
+        buckets = self._parse_text_sizes(options['text_sizes'])
+        if User.objects.filter(email_normalized=f'user1@{LOADTEST_DOMAIN}').exists():
+            raise CommandError('Synthetic users already exist, run again with --clean')
+
+        rng = random.Random(options['seed'])
+        # Descriptions are slices of one pregenerated text instead of word by word joins
+        max_length = max(size for _low, size, _weight in buckets)
+        text = ' '.join(rng.choice(WORDS) for _ in range(max_length // 4 + 1))
+        text = (text + ' ') * (2 * max_length // max(len(text), 1) + 2)
+
+        password_hash = hashing.hash_password(options['password'])
+        batch_size = options['batch_size']
+        total_users = options['users']
+        progress = {
+            'rows': 0, 'notes': 0, 'total_notes': total_users * options['notes_per_user'],
+            'started': time.perf_counter(), 'reported': 0.0,
+        }
+
+        for start in range(1, total_users + 1, batch_size):
+            users = []
+            for number in range(start, min(start + batch_size, total_users + 1)):
+                email = f'user{number}@{LOADTEST_DOMAIN}'
+                users.append(User(
+                    name=f'Load Test User {number}',
+                    email=email,
+                    email_normalized=email_key(email),
+                    password=password_hash,
+                    role=Role.USER.value,
+                ))
+            with transaction.atomic():
+                User.objects.bulk_create(users)
+            self._report(progress, len(users), 'users', start - 1 + len(users), total_users)
+
+            # bulk_create does not return ids on every backend
+            user_ids = list(User.objects.filter(
+                email_normalized__in=[user.email_normalized for user in users]
+            ).order_by('id').values_list('id', flat=True))
+            self._create_synthetic_notes(user_ids, rng, buckets, text, options, progress)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n✅ Created {total_users} users and {progress['notes']} notes "
+            f"in {time.perf_counter() - progress['started']:.1f}s, "
+            f"{self._rows_per_second(progress):.0f} rows/sec"
+        ))
+        self.stdout.write(f"Login: user1@{LOADTEST_DOMAIN} / {options['password']}")
+
+    def _create_synthetic_notes(self, user_ids, rng, buckets, text, options, progress):
+        batch_size = options['batch_size']
+        weights = [weight for _low, _size, weight in buckets]
+        notes = []
+        for user_id in user_ids:
+            for _ in range(options['notes_per_user']):
+                low, size, _weight = rng.choices(buckets, weights)[0]
+                length = rng.randint(low, size)
+                offset = rng.randrange(len(text) - length)
+                notes.append(Note(
+                    user_id=user_id,
+                    name=' '.join(rng.choices(WORDS, k=rng.randint(1, 4))).capitalize(),
+                    description=text[offset:offset + length],
+                ))
+                if len(notes) >= batch_size:
+                    self._insert_notes(notes, progress)
+                    notes = []
+        if notes:
+            self._insert_notes(notes, progress)
+
+    def _insert_notes(self, notes, progress):
+        with transaction.atomic():
+            Note.objects.bulk_create(notes)
+            # bulk_create skips post_save, which moves the list validators
+            NotesVersion.objects.bump({note.user_id for note in notes})
+        progress['notes'] += len(notes)
+        self._report(progress, len(notes), 'notes', progress['notes'], progress['total_notes'])
+
+    @staticmethod
+    def _rows_per_second(progress):
+        elapsed = time.perf_counter() - progress['started']
+        return progress['rows'] / elapsed if elapsed else float(progress['rows'])
+
+    def _report(self, progress, rows, label, done, total):
+        """Progress line at most once per second"""
+        progress['rows'] += rows
+        now = time.perf_counter()
+        if now - progress['reported'] < 1 and done != total:
+            return
+        progress['reported'] = now
+        self.stdout.write(
+            f'   {label}: {done}/{total}, {self._rows_per_second(progress):.0f} rows/sec')
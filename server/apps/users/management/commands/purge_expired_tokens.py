@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+
+from apps.users import purge
+
+
+class Command(BaseCommand):
+    help = 'Deletes expired outstanding and blacklisted tokens in primary key chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Primary key range deleted per transaction'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=None,
+            help='Seconds to sleep between batches'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report how many rows would be deleted'
+        )
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            counts = purge.count_expired()
+            self.stdout.write(
+                f"Expired outstanding tokens: {counts['outstanding']}\n"
+                f"Expired blacklisted tokens: {counts['blacklisted']}"
+            )
+            return
+
+        def report(progress):
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f"Batch {progress['batches']}: "
+                    f"{progress['outstanding']} outstanding, "
+                    f"{progress['blacklisted']} blacklisted deleted"
+                )
+
+        result = purge.purge_expired_tokens(
+            batch_size=options['batch_size'],
+            sleep=options['sleep'],
+            on_batch=report,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {result['outstanding']} outstanding and "
+            f"{result['blacklisted']} blacklisted tokens in {result['batches']} batches, "
+            f"{result['seconds']:.2f}s ({purge.rows_per_second(result):.0f} rows/sec)"
+        ))
@@ -0,0 +1,66 @@
+# Generated by Django 4.2 on 2026-10-17 13:02
+
+from django.db import migrations, models, transaction
+from django.db.models.functions import Lower
+
+BATCH_SIZE = 1000
+
+
+def check_case_duplicates(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    duplicates = list(
+        User.objects.using(schema_editor.connection.alias)
+        .values(email_lower=Lower('email'))
+        .annotate(count=models.Count('id'))
+        .filter(count__gt=1)
+        .values_list('email_lower', flat=True)[:10]
+    )
+    if duplicates:
+        raise RuntimeError(
+            'Emails differing only in case must be merged before migrating: '
+            + ', '.join(duplicates)
+        )
+
+
+def backfill_email_normalized(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    db_alias = schema_editor.connection.alias
+    last_id = 0
+    while True:
+        batch = list(
+            User.objects.using(db_alias)
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .only('id', 'email')[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        for user in batch:
+            user.email_normalized = user.email.strip().lower()
+        with transaction.atomic(using=db_alias):
+            User.objects.using(db_alias).bulk_update(batch, ['email_normalized'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+    # Each backfill batch commits on its own instead of one long transaction
+    atomic = False
+
+    dependencies = [
+        ('users', '0008_user_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicates, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='user',
+            name='email_normalized',
+            field=models.CharField(editable=False, max_length=254, null=True),
+        ),
+        migrations.RunPython(backfill_email_normalized, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='email_normalized',
+            field=models.CharField(editable=False, max_length=254, unique=True),
+        ),
+    ]
@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# Index for email_normalized LIKE 'prefix%' on SQLite, whose LIKE is
+# case-insensitive and only uses an index with the NOCASE collation.
+# PostgreSQL already has the varchar_pattern_ops "_like" index Django
+# creates for unique CharFields. A later migration that makes SQLite
+# rebuild the users table must create it again, see notes 0005.
+SQLITE_FORWARD = [
+    'CREATE INDEX users_email_prefix_idx ON users (email_normalized COLLATE NOCASE)',
+]
+
+SQLITE_BACKWARD = [
+    'DROP INDEX IF EXISTS users_email_prefix_idx',
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_user_email_normalized'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({'sqlite': SQLITE_FORWARD}),
+            _run({'sqlite': SQLITE_BACKWARD}),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-17 13:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_user_email_prefix_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='adminjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Indexes for the case-insensitive name__istartswith of the admin searches.
+# PostgreSQL compiles it to UPPER(name::text) LIKE UPPER('prefix%'), SQLite
+# to a plain LIKE, which is case-insensitive there and needs NOCASE.
+FORWARD = {
+    'postgresql': [
+        'CREATE INDEX users_name_prefix_idx ON users (UPPER(name::text) text_pattern_ops)',
+    ],
+    'sqlite': [
+        'CREATE INDEX users_name_prefix_idx ON users (name COLLATE NOCASE)',
+    ],
+}
+
+BACKWARD = {
+    'postgresql': ['DROP INDEX IF EXISTS users_name_prefix_idx'],
+    'sqlite': ['DROP INDEX IF EXISTS users_name_prefix_idx'],
+}
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_admin_job_heartbeat'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD), _run(BACKWARD)),
+    ]
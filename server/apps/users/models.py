@@ -1,11 +1,27 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.db import models
-import bcrypt
 
+from . import hashing
+from .concurrency import VersionedModelMixin
 from .enums import Role
 
 
+def email_key(email):
+    """Case-insensitive lookup key of an email address"""
+    return (email or '').strip().lower()
+
+
 class UserManager(BaseUserManager):
+    def get_by_natural_key(self, username):
+        return self.get(email_normalized=email_key(username))
+
+    def by_email(self, email):
+        return self.filter(email_normalized=email_key(email))
+
+    def email_in_use(self, email, exclude_id=None):
+        """Whether another user has this email in any letter case"""
+        return self.by_email(email).exclude(id=exclude_id).exists()
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
@@ -25,12 +41,16 @@ class UserManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
 
 
-class User(AbstractBaseUser):
+class User(VersionedModelMixin, AbstractBaseUser):
     name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
+    email_normalized = models.CharField(max_length=254, unique=True, editable=False)
     password = models.CharField(max_length=255)
     role = models.IntegerField(choices=Role.choices(), default=Role.USER.value)
     is_active = models.BooleanField(default=True)
+    token_version = models.PositiveIntegerField(default=0)
+    token_generation = models.PositiveIntegerField(default=0)
+    version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -41,20 +61,36 @@ class User(AbstractBaseUser):
 
     class Meta:
         db_table = 'users'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='users_created_id_idx'),
+            models.Index(fields=['role', 'created_at', 'id'], name='users_role_created_id_idx'),
+            models.Index(
+                fields=['is_active', 'created_at', 'id'],
+                name='users_active_created_id_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.email})"
 
+    def save(self, *args, **kwargs):
+        self.email_normalized = email_key(self.email)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'email' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'email_normalized'}
+        super().save(*args, **kwargs)
+
     def set_password(self, raw_password):
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(raw_password.encode('utf-8'), salt)
-        self.password = hashed.decode('utf-8')
+        self.password = hashing.hash_password(raw_password)
 
     def check_password(self, raw_password):
-        return bcrypt.checkpw(
-            raw_password.encode('utf-8'),
-            self.password.encode('utf-8')
-        )
+        return hashing.verify_password(raw_password, self.password)
+
+    async def aset_password(self, raw_password):
+        self.password = await hashing.ahash_password(raw_password)
+
+    async def acheck_password(self, raw_password):
+        return await hashing.averify_password(raw_password, self.password)
 
     def get_role(self):
         return Role(self.role)
@@ -72,3 +108,43 @@ class User(AbstractBaseUser):
 
     def has_module_perms(self, app_label):
         return self.is_superuser
+
+
+class AdminJob(models.Model):
+    """Admin mass action executed in batches by the background worker"""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
+    action = models.CharField(max_length=50)
+    user_ids = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING)
+    total = models.PositiveIntegerField(default=0)
+    processed = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'admin_jobs'
+        ordering = ['-id']
+
+    def __str__(self):
+        return f'{self.action} #{self.id}'
+
+    @property
+    def progress(self):
+        return self.processed / self.total if self.total else 1.0
@@ -0,0 +1,100 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class CreatedAtCursorPagination:
+    """
+    Keyset pagination over (created_at DESC, id DESC) with opaque cursors.
+    Pages are fetched with an index range scan at any depth, no OFFSET.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self, request):
+        self.request = request
+        self.page_size = self._get_page_size()
+        self.cursor = self._decode_cursor()
+
+    def _get_page_size(self):
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE', 10)
+        try:
+            requested = int(self.request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        return min(max(requested, 1), self.max_page_size)
+
+    def _decode_cursor(self):
+        encoded = self.request.GET.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            created_at = parse_datetime(data['c'])
+            if created_at is None:
+                raise ValueError
+            return created_at, int(data['i']), bool(data.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def _encode_cursor(self, row, reverse):
+        created_at, row_id = self._position(row)
+        data = {'c': created_at.isoformat(), 'i': row_id}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode('ascii')).decode('ascii')
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    @staticmethod
+    def _position(row):
+        if isinstance(row, dict):
+            return row['created_at'], row['id']
+        return row.created_at, row.id
+
+    def paginate_queryset(self, queryset):
+        """Ordered and filtered queryset for the page, one extra row to detect more"""
+        if self.cursor is None:
+            return queryset.order_by('-created_at', '-id')[:self.page_size + 1]
+
+        created_at, row_id, reverse = self.cursor
+        if reverse:
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=row_id)
+            ).order_by('created_at', 'id')
+        else:
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=row_id)
+            ).order_by('-created_at', '-id')
+        return queryset[:self.page_size + 1]
+
+    def get_page(self, rows):
+        """Rows of the page in display order and next/previous links"""
+        rows = list(rows)
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        reverse = self.cursor is not None and self.cursor[2]
+        if reverse:
+            rows.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = self.cursor is not None if not reverse else has_more
+
+        links = {'next': None, 'previous': None}
+        if rows and has_next:
+            links['next'] = self._encode_cursor(rows[-1], reverse=False)
+        if rows and has_previous:
+            links['previous'] = self._encode_cursor(rows[0], reverse=True)
+        elif has_previous:
+            links['previous'] = remove_query_param(
+                self.request.build_absolute_uri(), self.cursor_query_param)
+        return rows, links
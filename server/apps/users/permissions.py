@@ -0,0 +1,55 @@
+import operator
+from functools import reduce
+
+from django.conf import settings
+from rest_framework.permissions import BasePermission
+
+from .enums import Role
+from .tokens import ROLE_CLAIM
+
+
+def role_mask(*roles):
+    """Bitmask with one bit per role value"""
+    return reduce(operator.or_, (1 << Role(role).value for role in roles), 0)
+
+
+ADMIN_ROLES = role_mask(Role.ADMIN)
+ALL_ROLES = role_mask(*Role)
+
+
+def request_role(request):
+    """
+    Role value of the authenticated user, taken from the signed access token
+    claim unless ROLE_AUTHORIZATION FROM_CLAIMS is disabled
+    """
+    auth = getattr(request, 'auth', None)
+    if auth is not None and getattr(settings, 'ROLE_AUTHORIZATION', {}).get('FROM_CLAIMS', True):
+        try:
+            return int(auth[ROLE_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            pass
+    return getattr(request.user, 'role', None)
+
+
+def has_role(request, mask):
+    role = request_role(request)
+    return role is not None and role >= 0 and bool(mask & (1 << role))
+
+
+class RolePermission(BasePermission):
+    """Allows authenticated users whose role bit is set in mask"""
+    mask = 0
+    message = 'Insufficient permissions.'
+
+    def has_permission(self, request, view):
+        return bool(
+            request.user and request.user.is_authenticated and has_role(request, self.mask))
+
+
+def roles_permission(*roles):
+    """RolePermission subclass for roles, with the mask computed once"""
+    name = 'Has' + ''.join(Role(role).name.title() for role in roles) + 'Role'
+    return type(name, (RolePermission,), {'mask': role_mask(*roles)})
+
+
+IsAdmin = roles_permission(Role.ADMIN)
@@ -0,0 +1,119 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from .cache import LocalTTLCache, is_shared
+
+REVOKED = 1
+NOT_REVOKED = 0
+
+_config = {
+    'CACHE_PREFIX': 'jwt:revoked',
+    'LOCAL_MAXSIZE': 10000,
+    'LOCAL_NEGATIVE_TTL': 5,
+    **getattr(settings, 'TOKEN_REVOCATION', {}),
+}
+
+_local = LocalTTLCache(maxsize=_config['LOCAL_MAXSIZE'])
+
+
+def _cache_key(jti):
+    return f"{_config['CACHE_PREFIX']}:{jti}"
+
+
+def _remaining(exp):
+    """Seconds until the token expires, used as the cache timeout"""
+    if exp is None:
+        return 0
+    if hasattr(exp, 'timestamp'):
+        exp = exp.timestamp()
+    return max(int(exp - time.time()), 0)
+
+
+def _remember_locally(jti, value, ttl):
+    if value == NOT_REVOKED:
+        # Other workers may revoke the token, keep local negatives short
+        ttl = min(ttl, _config['LOCAL_NEGATIVE_TTL'])
+    _local.set(jti, value, ttl)
+
+
+def is_revoked(jti, exp):
+    """Check whether token is revoked: local LRU, shared cache, then database"""
+    value = _local.get(jti)
+    if value is not None:
+        return value == REVOKED
+
+    ttl = _remaining(exp)
+    if not ttl:
+        return False
+
+    value = cache.get(_cache_key(jti))
+    if value is None:
+        exists = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        value = REVOKED if exists else NOT_REVOKED
+        if value == REVOKED:
+            cache.set(_cache_key(jti), value, timeout=ttl)
+        elif is_shared():
+            # add never replaces REVOKED written by a revocation committed meanwhile
+            cache.add(_cache_key(jti), value, timeout=ttl)
+
+    _remember_locally(jti, value, ttl)
+    return value == REVOKED
+
+
+async def ais_revoked(jti, exp):
+    """Async variant of is_revoked"""
+    value = _local.get(jti)
+    if value is not None:
+        return value == REVOKED
+
+    ttl = _remaining(exp)
+    if not ttl:
+        return False
+
+    value = await cache.aget(_cache_key(jti))
+    if value is None:
+        exists = await BlacklistedToken.objects.filter(token__jti=jti).aexists()
+        value = REVOKED if exists else NOT_REVOKED
+        if value == REVOKED:
+            await cache.aset(_cache_key(jti), value, timeout=ttl)
+        elif is_shared():
+            await cache.aadd(_cache_key(jti), value, timeout=ttl)
+
+    _remember_locally(jti, value, ttl)
+    return value == REVOKED
+
+
+def _store_revoked(jti, ttl):
+    cache.set(_cache_key(jti), REVOKED, timeout=ttl)
+    _local.set(jti, REVOKED, ttl)
+
+
+def mark_revoked(jti, exp):
+    """
+    Record revoked token in both cache layers until it expires, once the
+    current transaction commits. Written earlier, a check reading the
+    database before the commit could replace it with NOT_REVOKED.
+    """
+    ttl = _remaining(exp)
+    if not ttl:
+        return
+    transaction.on_commit(lambda: _store_revoked(jti, ttl))
+
+
+def _drop(jti):
+    cache.delete(_cache_key(jti))
+    _local.delete(jti)
+
+
+def forget(jti):
+    """Drop cached revocation state once a blacklist entry removal commits"""
+    transaction.on_commit(lambda: _drop(jti))
+
+
+def stats():
+    """In-process revocation cache hits and misses"""
+    return _local.stats()
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
-from .models import User, Role
+from .concurrency import VersionedUpdateMixin
+from .models import User
+from .permissions import ADMIN_ROLES, has_role
 
 
 class RegisterSerializer(serializers.ModelSerializer):
@@ -14,6 +16,11 @@ class RegisterSerializer(serializers.ModelSerializer):
             'name': {'required': True},
         }
 
+    def validate_email(self, value):
+        if User.objects.email_in_use(value):
+            raise serializers.ValidationError("User with this email already exists.")
+        return value
+
     def create(self, validated_data):
         user = User.objects.create_user(
             email=validated_data['email'],
@@ -23,10 +30,12 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
-class LoginSerializer(serializers.Serializer):
+class CredentialsSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
 
+
+class LoginSerializer(CredentialsSerializer):
     def validate(self, data):
         email = data.get('email')
         password = data.get('password')
@@ -55,21 +64,27 @@ class UserDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'email', 'name', 'role',
-                  'is_active', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'created_at', 'updated_at')
+                  'is_active', 'version', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'version', 'created_at', 'updated_at')
 
 
-class UserUpdateSerializer(serializers.ModelSerializer):
+class UserUpdateSerializer(VersionedUpdateMixin, serializers.ModelSerializer):
     class Meta:
         model = User
-        fields = ('email', 'name', 'role')
+        fields = ('email', 'name', 'role', 'version')
         extra_kwargs = {
             'email': {'required': False},
             'name': {'required': False},
+            'version': {'required': False},
         }
 
+    def validate_email(self, value):
+        if User.objects.email_in_use(value, exclude_id=getattr(self.instance, 'id', None)):
+            raise serializers.ValidationError("User with this email already exists.")
+        return value
+
     def validate_role(self, value):
         request = self.context.get('request')
-        if request and request.user.role != Role.ADMIN.value:
+        if request and not has_role(request, ADMIN_ROLES):
             raise serializers.ValidationError("Only admin can change role.")
         return value
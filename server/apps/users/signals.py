@@ -0,0 +1,20 @@
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from . import purge, revocation
+
+request_started.connect(purge.start_periodic_purge, dispatch_uid='users.start_periodic_purge')
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def cache_blacklisted_token(sender, instance, created, **kwargs):
+    """Populate revocation cache whenever a token gets blacklisted"""
+    revocation.mark_revoked(instance.token.jti, instance.token.expires_at)
+
+
+@receiver(post_delete, sender=BlacklistedToken)
+def forget_blacklisted_token(sender, instance, **kwargs):
+    """Invalidate revocation cache when a blacklist entry is removed"""
+    revocation.forget(instance.token.jti)
@@ -0,0 +1,145 @@
+from unittest import mock
+
+from django.contrib import admin
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .admin import CustomUserAdmin
+from .checks import shared_cache_check
+from .concurrency import ConcurrentUpdate
+from .enums import Role
+from .filters import UserFilter
+from .models import User
+from .pagination import CreatedAtCursorPagination
+
+
+class UserListQueryPlanTests(TestCase):
+    """Every user list filter is answered from an index, not a table scan"""
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([
+            User(
+                name=f'User {number}',
+                email=f'user{number}@example.com',
+                email_normalized=f'user{number}@example.com',
+                role=Role.ADMIN.value if number % 10 == 0 else Role.USER.value,
+                is_active=number % 3 != 0,
+            )
+            for number in range(200)
+        ])
+
+    def explain(self, params):
+        request = RequestFactory().get('/api/auth/users/', params)
+        filterset = UserFilter(request.GET, queryset=User.objects.all())
+        self.assertTrue(filterset.is_valid(), filterset.errors)
+        page = CreatedAtCursorPagination(request).paginate_queryset(filterset.qs)
+        return page.explain()
+
+    def assertUsesIndex(self, params, index_name):
+        plan = self.explain(params)
+        self.assertRegex(plan, index_name, plan)
+        self.assertNotRegex(plan, r'SCAN users\b(?! USING)|Seq Scan on users', plan)
+
+    def test_role(self):
+        self.assertUsesIndex({'role': Role.ADMIN.value}, 'users_role_created_id_idx')
+
+    def test_is_active(self):
+        self.assertUsesIndex({'is_active': 'false'}, 'users_active_created_id_idx')
+        self.assertUsesIndex({'is_active': 'true'}, 'users_active_created_id_idx')
+
+    def test_created_at_range(self):
+        self.assertUsesIndex({
+            'created_at_after': '2020-01-01T00:00:00Z',
+            'created_at_before': '2030-01-01T00:00:00Z',
+        }, 'users_created_id_idx')
+
+    def test_email_prefix(self):
+        if connection.vendor == 'postgresql':
+            # varchar_pattern_ops index Django adds for the unique column
+            index_name = r'users_email_normalized_\w+_like'
+        else:
+            index_name = 'users_email_prefix_idx'
+        self.assertUsesIndex({'email': 'USER1'}, index_name)
+
+    def test_email_prefix_is_case_insensitive(self):
+        request = RequestFactory().get('/api/auth/users/', {'email': 'USER19'})
+        emails = set(UserFilter(request.GET, queryset=User.objects.all()).qs.values_list(
+            'email', flat=True))
+        self.assertEqual(emails, {'user19@example.com', *(f'user19{n}@example.com' for n in range(10))})
+
+    def test_admin_search(self):
+        user_admin = CustomUserAdmin(User, admin.site)
+        queryset, _ = user_admin.get_search_results(None, User.objects.all(), 'user 19')
+        plan = queryset.explain()
+        self.assertRegex(plan, 'users_name_prefix_idx', plan)
+        self.assertNotRegex(plan, r'SCAN users\b(?! USING)|Seq Scan on users', plan)
+        self.assertEqual(
+            set(queryset.values_list('name', flat=True)),
+            {'User 19', *(f'User 19{n}' for n in range(10))})
+
+
+class VersionConflictTests(TestCase):
+    """Stale saves fail with a conflict without breaking the transaction"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin@example.com', 'Secret123!', name='Admin')
+        cls.user = User.objects.create_user('user@example.com', 'Secret123!', name='User')
+
+    def make_stale(self):
+        stale = User.objects.get(id=self.user.id)
+        User.objects.filter(id=self.user.id).update(name='Changed', version=stale.version + 1)
+        return stale
+
+    def test_stale_save(self):
+        stale = self.make_stale()
+        stale.name = 'Stale'
+        with self.assertRaises(ConcurrentUpdate):
+            stale.save()
+        self.assertEqual(User.objects.get(id=self.user.id).name, 'Changed')
+
+    def test_stale_put(self):
+        stale = self.make_stale()
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        url = f'/api/auth/users/{self.user.id}/'
+        response = client.put(url, {'name': 'Stale', 'version': stale.version}, format='json')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(client.get(url).data['name'], 'Changed')
+
+    def test_stale_admin_save(self):
+        stale = self.make_stale()
+        self.client.force_login(self.admin)
+        url = f'/admin/users/user/{self.user.id}/change/'
+        data = {'email': stale.email, 'name': 'Stale', 'role': stale.role, 'is_active': 'on'}
+        with mock.patch.object(CustomUserAdmin, 'get_object', return_value=stale):
+            response = self.client.post(url, data)
+        self.assertRedirects(response, url)
+        self.assertIn('modified concurrently', str(list(get_messages(response.wsgi_request))[0]))
+        self.assertEqual(User.objects.get(id=self.user.id).name, 'Changed')
+
+
+class SharedCacheCheckTests(SimpleTestCase):
+    """users.W001 only fires when several workers run on a process-local cache"""
+
+    locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    database = {'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}
+
+    def ids(self):
+        return [message.id for message in shared_cache_check(None)]
+
+    def test_single_worker(self):
+        with override_settings(WEB_CONCURRENCY=1, CACHES=self.locmem):
+            self.assertEqual(self.ids(), [])
+
+    def test_several_workers(self):
+        with override_settings(WEB_CONCURRENCY=4, CACHES=self.locmem):
+            self.assertEqual(self.ids(), ['users.W001'])
+
+    def test_several_workers_shared_cache(self):
+        with override_settings(WEB_CONCURRENCY=4, CACHES=self.database):
+            self.assertEqual(self.ids(), [])
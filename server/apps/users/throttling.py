@@ -0,0 +1,171 @@
+import logging
+import math
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+from .cache import LocalTTLCache
+from .models import email_key
+
+logger = logging.getLogger(__name__)
+
+_config = {
+    'ENABLED': True,
+    'CACHE_PREFIX': 'throttle',
+    'LOCAL_MAXSIZE': 10000,
+    'RATES': {},
+    **getattr(settings, 'AUTH_THROTTLE', {}),
+}
+
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' as (capacity, period in seconds)"""
+    num, period = rate.split('/')
+    return int(num), _PERIODS[period[0]]
+
+
+class SlidingWindow:
+    """
+    At most `capacity` requests per sliding `period`. The count of the
+    current fixed window is added to the count of the previous one, weighted
+    by the part of it still inside the period, so bursts at a window
+    boundary cannot reach twice the capacity. Counters live in the shared
+    cache and are only changed with add and incr, so concurrent requests of
+    all workers each take their own slot. A lock protected in-process
+    counter is used while the cache is unreachable.
+    """
+    _local = LocalTTLCache(maxsize=_config['LOCAL_MAXSIZE'])
+    _local_lock = threading.Lock()
+
+    def __init__(self, scope, rate):
+        self.scope = scope
+        self.capacity, self.period = parse_rate(rate)
+
+    def _keys(self, ident, index):
+        prefix = f"{_config['CACHE_PREFIX']}:{self.scope}:{ident}"
+        return f'{prefix}:{index}', f'{prefix}:{index - 1}'
+
+    def _wait(self, previous, count, elapsed):
+        """Seconds until the weighted count leaves room for this request"""
+        if previous * (1 - elapsed / self.period) + count <= self.capacity:
+            return 0
+        if count <= self.capacity:
+            # Room appears as the previous window slides out
+            return self.period * (1 - (self.capacity - count) / previous) - elapsed
+        # Only once the current window has become the previous one
+        return self.period - elapsed + self.period * (1 - (self.capacity - 1) / count)
+
+    def _consume_locally(self, key, previous_key, elapsed, timeout):
+        with self._local_lock:
+            previous = self._local.get(previous_key) or 0
+            count = (self._local.get(key) or 0) + 1
+            wait = self._wait(previous, count, elapsed)
+            if not wait:
+                self._local.set(key, count, timeout)
+            return wait
+
+    def consume(self, ident):
+        """Take a slot for ident, returning the seconds to wait when there is none"""
+        index, elapsed = divmod(time.time(), self.period)
+        key, previous_key = self._keys(ident, int(index))
+        # The count is read as the previous window until the next one ends
+        timeout = math.ceil(2 * self.period - elapsed)
+        try:
+            cache.add(key, 0, timeout=timeout)
+            count = cache.incr(key)
+            wait = self._wait(cache.get(previous_key) or 0, count, elapsed)
+            if wait:
+                # Rejected requests do not use up the budget
+                cache.decr(key)
+            return wait
+        except Exception:
+            logger.warning('Throttle cache unavailable, using local counter', exc_info=True)
+            return self._consume_locally(key, previous_key, elapsed, timeout)
+
+    async def aconsume(self, ident):
+        """Async variant of consume"""
+        # BaseCache.aincr is a get followed by a set, only the sync incr is atomic
+        return await sync_to_async(self.consume)(ident)
+
+
+limits = {scope: SlidingWindow(scope, rate) for scope, rate in _config['RATES'].items()}
+
+
+def _retry_after(wait):
+    return max(math.ceil(wait), 1) if wait else None
+
+
+def client_ident(request):
+    """Client address, honouring REST_FRAMEWORK NUM_PROXIES like DRF throttles"""
+    return BaseThrottle().get_ident(request)
+
+
+def check(*scoped_idents):
+    """
+    Take a slot from each (scope, ident) limit, returning Retry-After
+    seconds when one of them is used up, otherwise None
+    """
+    if not _config['ENABLED']:
+        return None
+    for scope, ident in scoped_idents:
+        if ident and scope in limits:
+            wait = limits[scope].consume(ident)
+            if wait:
+                return _retry_after(wait)
+    return None
+
+
+async def acheck(*scoped_idents):
+    """Async variant of check"""
+    if not _config['ENABLED']:
+        return None
+    for scope, ident in scoped_idents:
+        if ident and scope in limits:
+            wait = await limits[scope].aconsume(ident)
+            if wait:
+                return _retry_after(wait)
+    return None
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """DRF throttle drawing from the SlidingWindow of `scope`"""
+    scope = None
+
+    def get_limit_ident(self, request):
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        self.retry_after = check((self.scope, self.get_limit_ident(request)))
+        return self.retry_after is None
+
+    def wait(self):
+        return self.retry_after
+
+
+class LoginIPThrottle(SlidingWindowThrottle):
+    scope = 'login_ip'
+
+
+class LoginEmailThrottle(SlidingWindowThrottle):
+    scope = 'login_email'
+
+    def get_limit_ident(self, request):
+        # Bodies that are not objects are rejected by the serializer with a 400
+        if not isinstance(request.data, dict):
+            return None
+        email = request.data.get('email')
+        return email_key(email) if isinstance(email, str) else None
+
+
+class RegisterThrottle(SlidingWindowThrottle):
+    scope = 'register_ip'
+
+
+class RefreshThrottle(SlidingWindowThrottle):
+    scope = 'refresh_ip'
@@ -0,0 +1,83 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from . import keyring
+from .enums import Role
+from .models import User
+
+ROLE_CLAIM = 'role'
+TOKEN_VERSION_CLAIM = 'token_version'
+TOKEN_GENERATION_CLAIM = 'token_generation'
+
+
+class KeyRingTokenMixin:
+    """Sign and verify tokens with the configured key ring"""
+
+    @property
+    def token_backend(self):
+        return keyring.get_token_backend()
+
+
+class CustomAccessToken(KeyRingTokenMixin, AccessToken):
+    pass
+
+
+class CustomRefreshToken(KeyRingTokenMixin, RefreshToken):
+    """Refresh token carrying role, token version and generation claims (copied to access token)"""
+
+    access_token_class = CustomAccessToken
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[ROLE_CLAIM] = user.role
+        token[TOKEN_VERSION_CLAIM] = user.token_version
+        token[TOKEN_GENERATION_CLAIM] = user.token_generation
+        return token
+
+
+class ClaimsUser:
+    """
+    Lightweight user resolved from access token claims.
+    Loads the User row only when an attribute outside of the claims is accessed.
+    """
+
+    is_active = True
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, token):
+        self.token = token
+        self.id = self.pk = token[api_settings.USER_ID_CLAIM]
+        self.role = token[ROLE_CLAIM]
+        self.token_version = token[TOKEN_VERSION_CLAIM]
+
+    def __str__(self):
+        return f'ClaimsUser {self.id}'
+
+    def __eq__(self, other):
+        return getattr(other, 'pk', None) == self.pk
+
+    def __hash__(self):
+        return hash(self.pk)
+
+    def get_role(self):
+        return Role(self.role)
+
+    @property
+    def is_staff(self):
+        return self.role == Role.ADMIN.value
+
+    @property
+    def is_superuser(self):
+        return self.role == Role.ADMIN.value
+
+    @cached_property
+    def _user(self):
+        return User.objects.get(pk=self.pk)
+
+    def __getattr__(self, attr):
+        if attr.startswith('__'):
+            raise AttributeError(attr)
+        return getattr(self._user, attr)
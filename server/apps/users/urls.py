@@ -1,15 +1,26 @@
+from django.conf import settings
 from django.urls import path
+from . import async_views
 from .views import (
     RegisterView, LoginView, RefreshTokenView,
-    LogoutView, UserListView, UserDetailView
+    LogoutView, LogoutAllView, UserListView, UserDetailView, CacheStatsView
 )
 
+if settings.ASYNC_VIEWS:
+    register_view = async_views.register_view
+    login_view = async_views.login_view
+else:
+    register_view = RegisterView.as_view()
+    login_view = LoginView.as_view()
+
 urlpatterns = [
-    path('register/', RegisterView.as_view(), name='register'),
-    path('login/', LoginView.as_view(), name='login'),
+    path('register/', register_view, name='register'),
+    path('login/', login_view, name='login'),
     path('refresh/', RefreshTokenView.as_view(), name='token_refresh'),
     path('logout/', LogoutView.as_view(), name='logout'),
+    path('logout-all/', LogoutAllView.as_view(), name='logout-all'),
 
     path('users/', UserListView.as_view(), name='user-list'),
     path('users/<int:user_id>/', UserDetailView.as_view(), name='user-detail'),
+    path('cache-stats/', CacheStatsView.as_view(), name='cache-stats'),
 ]
@@ -0,0 +1,39 @@
+"""
+Offline verification of access tokens issued by this service.
+
+Depends only on PyJWT (with cryptography) so downstream services can copy it:
+
+    verifier = TokenVerifier('https://auth.example.com/.well-known/jwks.json')
+    payload = verifier.verify(raw_token)
+"""
+import jwt
+from jwt import PyJWKClient
+
+
+class TokenVerifier:
+    """Verifies JWTs against a JWKS endpoint, caching parsed keys by kid"""
+
+    def __init__(self, jwks_url, algorithms=('RS256', 'EdDSA'), audience=None,
+                 issuer=None, lifespan=86400, leeway=0):
+        self.algorithms = list(algorithms)
+        self.audience = audience
+        self.issuer = issuer
+        self.leeway = leeway
+        # Unknown kid triggers a JWKS refetch, so rotated keys are picked up
+        self.client = PyJWKClient(jwks_url, cache_keys=True, lifespan=lifespan)
+
+    def verify(self, token, token_type='access'):
+        """Return payload of a valid token, raise jwt.InvalidTokenError otherwise"""
+        signing_key = self.client.get_signing_key_from_jwt(token)
+        payload = jwt.decode(
+            token,
+            signing_key.key,
+            algorithms=self.algorithms,
+            audience=self.audience,
+            issuer=self.issuer,
+            leeway=self.leeway,
+            options={'verify_aud': self.audience is not None},
+        )
+        if token_type and payload.get('token_type') != token_type:
+            raise jwt.InvalidTokenError('Token has wrong type')
+        return payload
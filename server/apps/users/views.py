@@ -1,32 +1,47 @@
+import os
+
 from django.utils import timezone
 from rest_framework import permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken, AccessToken
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from apps.notes import cache as notes_cache
 from apps.users.decorators import require_roles
+from apps.users.tokens import TOKEN_GENERATION_CLAIM, CustomAccessToken, CustomRefreshToken
 
 
+from . import conditional, counters, encoders, keyring, revocation
+from .authentication import CustomJWTAuthentication
+from .concurrency import ConcurrentUpdate, ConflictError
 from .enums import Role
+from .filters import UserFilter
 from .models import User
+from .permissions import ADMIN_ROLES, has_role
+from .pagination import CreatedAtCursorPagination
+from .renderers import FastRendererMixin
 from .serializers import (
     RegisterSerializer, LoginSerializer,
     UserListSerializer, UserDetailSerializer,
     UserUpdateSerializer
 )
+from .throttling import (
+    LoginEmailThrottle, LoginIPThrottle, RefreshThrottle, RegisterThrottle
+)
 
 
 class RegisterView(APIView):
     """User registration"""
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RegisterThrottle]
 
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = CustomRefreshToken.for_user(user)
 
             return Response({
                 'refresh': str(refresh),
@@ -39,13 +54,14 @@ class RegisterView(APIView):
 class LoginView(APIView):
     """User authentication"""
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [LoginIPThrottle, LoginEmailThrottle]
 
     def post(self, request):
         serializer = LoginSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.validated_data['user']
 
-            refresh = RefreshToken.for_user(user)
+            refresh = CustomRefreshToken.for_user(user)
 
             return Response({
                 'refresh': str(refresh),
@@ -58,6 +74,7 @@ class LoginView(APIView):
 class RefreshTokenView(APIView):
     """Refresh access token"""
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [RefreshThrottle]
 
     def post(self, request):
         refresh_token = request.data.get('refresh')
@@ -69,7 +86,7 @@ class RefreshTokenView(APIView):
             )
 
         try:
-            refresh = RefreshToken(refresh_token)
+            refresh = CustomRefreshToken(refresh_token)
 
             user_id = refresh.payload.get('user_id')
             user = get_object_or_404(User, id=user_id)
@@ -80,7 +97,14 @@ class RefreshTokenView(APIView):
                     status=status.HTTP_401_UNAUTHORIZED
                 )
 
-            new_refresh = RefreshToken.for_user(user)
+            generation = refresh.payload.get(TOKEN_GENERATION_CLAIM)
+            if generation is not None and generation != user.token_generation:
+                return Response(
+                    {'error': 'Refresh token has been revoked'},
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
+
+            new_refresh = CustomRefreshToken.for_user(user)
 
             return Response({
                 'refresh': str(new_refresh),
@@ -108,7 +132,7 @@ class LogoutView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
 
-            refresh = RefreshToken(refresh_token)
+            refresh = CustomRefreshToken(refresh_token)
             refresh.blacklist()
 
             auth_header = request.headers.get('Authorization', '')
@@ -116,7 +140,7 @@ class LogoutView(APIView):
                 access_token_str = auth_header.split(' ')[1]
 
                 try:
-                    access_token = AccessToken(access_token_str)
+                    access_token = CustomAccessToken(access_token_str)
 
                     jti = access_token['jti']
 
@@ -126,7 +150,7 @@ class LogoutView(APIView):
                             'token': str(access_token),
                             'created_at': timezone.now(),
                             'expires_at': timezone.datetime.fromtimestamp(access_token['exp'], tz=timezone.utc),
-                            'user': request.user,
+                            'user_id': request.user.id,
                         }
                     )
 
@@ -153,60 +177,150 @@ class LogoutView(APIView):
             )
 
 
-class UserListView(APIView):
+class LogoutAllView(APIView):
+    """Logout from all devices by bumping the user's token generation"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        counters.token_generation.bump([request.user.id])
+        return Response(
+            {'message': 'Successfully logged out from all devices.'},
+            status=status.HTTP_200_OK
+        )
+
+
+class UserListView(FastRendererMixin, APIView):
     """Get user list"""
     permission_classes = [permissions.IsAuthenticated]
 
     @require_roles(Role.ADMIN)
     def get(self, request):
-        users = User.objects.filter()
+        filterset = UserFilter(request.GET, queryset=User.objects.all())
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        paginator = CreatedAtCursorPagination(request)
+        if encoders.is_enabled():
+            encoder = encoders.row_encoder(UserListSerializer)
+            users, links = paginator.get_page(paginator.paginate_queryset(
+                filterset.qs.values(*encoder.fields)))
+            return Response({'users': encoder.encode(users), **links})
+
+        users, links = paginator.get_page(paginator.paginate_queryset(filterset.qs))
         serializer = UserListSerializer(users, many=True)
-        return Response({'users': serializer.data})
+        return Response({'users': serializer.data, **links})
 
 
 class UserDetailView(APIView):
     """Get/update/delete user"""
     permission_classes = [permissions.IsAuthenticated]
 
+    @staticmethod
+    def _can_manage(request, user_id):
+        return request.user.id == user_id or has_role(request, ADMIN_ROLES)
+
     def get(self, request, user_id):
+        if conditional.is_conditional(request):
+            # Answer revalidation from updated_at alone, without loading the row
+            updated_at = User.objects.filter(id=user_id).values_list(
+                'updated_at', flat=True).first()
+            if updated_at is not None and self._can_manage(request, user_id):
+                not_modified = conditional.precondition_response(
+                    request, *conditional.object_validators(user_id, updated_at))
+                if not_modified is not None:
+                    return not_modified
+
         user = get_object_or_404(User, id=user_id)
 
-        if request.user.role != Role.ADMIN.value and request.user.id != user.id:
+        if not self._can_manage(request, user.id):
             return Response(
                 {'error': 'You do not have permission to access this user'},
                 status=status.HTTP_403_FORBIDDEN
             )
 
         serializer = UserDetailSerializer(user)
-        return Response(serializer.data)
+        return conditional.set_validators(
+            Response(serializer.data),
+            *conditional.object_validators(user.id, user.updated_at))
 
     def put(self, request, user_id):
         user = get_object_or_404(User, id=user_id)
 
-        if request.user.role != Role.ADMIN.value and request.user.id != user.id:
+        if not self._can_manage(request, user.id):
             return Response(
                 {'error': 'You do not have permission to update this user'},
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        failed = conditional.precondition_response(
+            request, *conditional.object_validators(user.id, user.updated_at))
+        if failed is not None:
+            return failed
+
         serializer = UserUpdateSerializer(
             user, data=request.data, context={'request': request})
         if serializer.is_valid():
+            role = user.role
             serializer.save()
-            return Response(serializer.data)
+            if user.role != role:
+                counters.token_version.bump([user.id])
+            return conditional.set_validators(
+                Response(serializer.data),
+                *conditional.object_validators(user.id, user.updated_at))
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, user_id):
         user = get_object_or_404(User, id=user_id)
 
-        if request.user.role != Role.ADMIN.value and request.user.id != user.id:
+        if not self._can_manage(request, user.id):
             return Response(
                 {'error': 'You do not have permission to delete this user'},
                 status=status.HTTP_403_FORBIDDEN
             )
 
+        failed = conditional.precondition_response(
+            request, *conditional.object_validators(user.id, user.updated_at))
+        if failed is not None:
+            return failed
+
         user.is_active = False
-        user.save()
+        try:
+            user.save(update_fields=['is_active', 'updated_at'])
+        except ConcurrentUpdate:
+            raise ConflictError()
+        counters.token_version.bump([user.id])
 
         return Response({'id': user_id}, status=status.HTTP_200_OK)
+
+
+class CacheStatsView(APIView):
+    """Hit ratios of the caches of the process serving the request"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    @require_roles(Role.ADMIN)
+    def get(self, request):
+        return Response({
+            'pid': os.getpid(),
+            'notes_responses': {'enabled': notes_cache.is_enabled(), **notes_cache.stats()},
+            'token_verification': CustomJWTAuthentication.verification_cache.stats(),
+            'revocation': revocation.stats(),
+        })
+
+
+class JWKSView(APIView):
+    """Public verification keys for downstream services"""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        body, etag = keyring.get_jwks()
+
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(body, content_type='application/json')
+
+        response['ETag'] = etag
+        response['Cache-Control'] = f'public, max-age={keyring.jwks_max_age()}'
+        return response
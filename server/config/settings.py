@@ -27,6 +27,7 @@ INSTALLED_APPS = [
     'rest_framework',
     'corsheaders',
     'drf_yasg',
+    'django_filters',
 
     # Local apps
     'apps.users',
@@ -64,6 +65,9 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'config.wsgi.application'
 
+# Serve async view variants, enabled by default under config.asgi
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
@@ -71,6 +75,19 @@ DATABASES = {
     }
 }
 
+# Number of server worker processes, the variable gunicorn and uvicorn read
+WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+
+# Revocation, token counters, auth throttling and the notes response cache
+# share state between workers through this cache. The process-local default
+# only suits WEB_CONCURRENCY=1, the users.W001 check warns about anything more.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
 # Password hashing with bcrypt
 PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
@@ -79,6 +96,14 @@ PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.Argon2PasswordHasher',
 ]
 
+# Process pool for bcrypt in async login/register views
+PASSWORD_HASHING_POOL = {
+    'MAX_WORKERS': int(os.getenv('PASSWORD_HASHING_WORKERS', os.cpu_count() or 1)),
+    # Requests allowed to wait for a free worker before answering 503
+    'MAX_QUEUE': int(os.getenv('PASSWORD_HASHING_QUEUE', 32)),
+    'RETRY_AFTER': int(os.getenv('PASSWORD_HASHING_RETRY_AFTER', 1)),
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -110,6 +135,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom user model
 AUTH_USER_MODEL = 'users.User'
 
+AUTHENTICATION_BACKENDS = [
+    'apps.users.backends.EmailBackend',
+]
+
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
@@ -142,7 +171,7 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
 
     'AUTH_TOKEN_CLASSES': (
-        'rest_framework_simplejwt.tokens.AccessToken',
+        'apps.users.tokens.CustomAccessToken',
     ),
     'TOKEN_TYPE_CLAIM': 'token_type',
     'JTI_CLAIM': 'jti',
@@ -152,6 +181,96 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Asymmetric signing (RS256/RS384/RS512/EdDSA) with a key ring served as JWKS.
+# JWT_KEYS_DIR holds <kid>.pem private and <kid>.pub.pem public keys,
+# JWT_SIGNING_KID selects the key used for new tokens. HS* keeps SIGNING_KEY.
+JWT_KEYRING = {
+    'ALGORITHM': os.getenv('JWT_ALGORITHM', 'HS256'),
+    'KEYS_DIR': os.getenv('JWT_KEYS_DIR', os.path.join(BASE_DIR, 'keys')),
+    'SIGNING_KID': os.getenv('JWT_SIGNING_KID', ''),
+    'JWKS_MAX_AGE': int(os.getenv('JWT_JWKS_MAX_AGE', 86400)),
+}
+
+# Request budgets of the unauthenticated auth endpoints, checked before any
+# bcrypt work. '<count>/<period>': count requests per sliding period
+AUTH_THROTTLE = {
+    'ENABLED': os.getenv('AUTH_THROTTLE', 'True') == 'True',
+    'CACHE_PREFIX': 'throttle',
+    'LOCAL_MAXSIZE': int(os.getenv('AUTH_THROTTLE_LOCAL_MAXSIZE', 10000)),
+    'RATES': {
+        'login_ip': os.getenv('AUTH_THROTTLE_LOGIN_IP', '30/min'),
+        'login_email': os.getenv('AUTH_THROTTLE_LOGIN_EMAIL', '10/min'),
+        'register_ip': os.getenv('AUTH_THROTTLE_REGISTER_IP', '10/hour'),
+        'refresh_ip': os.getenv('AUTH_THROTTLE_REFRESH_IP', '60/min'),
+    },
+}
+
+# Revocation check cache for JWT blacklist
+TOKEN_REVOCATION = {
+    'CACHE_PREFIX': 'jwt:revoked',
+    'LOCAL_MAXSIZE': int(os.getenv('TOKEN_REVOCATION_LOCAL_MAXSIZE', 10000)),
+    # Seconds a "not revoked" answer is trusted by a single worker
+    'LOCAL_NEGATIVE_TTL': int(os.getenv('TOKEN_REVOCATION_LOCAL_NEGATIVE_TTL', 5)),
+}
+
+# Chunked deletion of expired token_blacklist rows
+TOKEN_PURGE = {
+    'BATCH_SIZE': int(os.getenv('TOKEN_PURGE_BATCH_SIZE', 1000)),
+    'SLEEP': float(os.getenv('TOKEN_PURGE_SLEEP', 0.1)),
+    # Seconds between in-process purges, 0 disables the background thread
+    'INTERVAL': int(os.getenv('TOKEN_PURGE_INTERVAL', 0)),
+}
+
+# Admin mass actions run in batches by an in-process worker thread
+ADMIN_JOBS = {
+    'BATCH_SIZE': int(os.getenv('ADMIN_JOBS_BATCH_SIZE', 1000)),
+    'SLEEP': float(os.getenv('ADMIN_JOBS_SLEEP', 0)),
+    # Running jobs without a heartbeat for this many seconds are resumed
+    'STALE_AFTER': int(os.getenv('ADMIN_JOBS_STALE_AFTER', 300)),
+}
+
+# In-process cache of verified access tokens
+TOKEN_VERIFICATION_CACHE = {
+    'ENABLED': os.getenv('TOKEN_VERIFICATION_CACHE', 'True') == 'True',
+    'MAXSIZE': int(os.getenv('TOKEN_VERIFICATION_CACHE_MAXSIZE', 10000)),
+}
+
+# Resolve request.user from access token claims instead of loading the User row
+TOKEN_USER = {
+    'ENABLED': os.getenv('JWT_TOKEN_USER', 'False') == 'True',
+    'VERSION_CACHE_TIMEOUT': int(os.getenv('JWT_TOKEN_VERSION_CACHE_TIMEOUT', 300)),
+}
+
+# Authorize roles from the signed access token claim instead of request.user
+ROLE_AUTHORIZATION = {
+    'FROM_CLAIMS': os.getenv('ROLE_FROM_CLAIMS', 'True') == 'True',
+}
+
+# Delta sync of notes, /api/notes/changes/
+NOTES_SYNC = {
+    'PAGE_SIZE': int(os.getenv('NOTES_SYNC_PAGE_SIZE', 500)),
+    # Days tombstones of deleted notes are kept, older cursors need a full resync
+    'TOMBSTONE_TTL_DAYS': int(os.getenv('NOTES_TOMBSTONE_TTL_DAYS', 30)),
+    # Seconds of changes sent again by every sync, must exceed the longest
+    # write transaction so notes committed late are not skipped
+    'SAFETY_WINDOW_SECONDS': int(os.getenv('NOTES_SYNC_SAFETY_WINDOW', 10)),
+}
+
+# List endpoints and exports encode .values() rows instead of running
+# ModelSerializers, and render JSON with orjson when it is installed
+FAST_SERIALIZATION = {
+    'ENABLED': os.getenv('FAST_SERIALIZATION', 'False') == 'True',
+}
+
+# Per-user versioned cache of notes list and detail responses. Versions bumped
+# by one worker must be seen by all of them, so with several workers either use
+# a shared CACHE_BACKEND or turn the response cache off
+NOTES_RESPONSE_CACHE = {
+    'ENABLED': os.getenv('NOTES_RESPONSE_CACHE', 'True') == 'True',
+    'CACHE_ALIAS': 'default',
+    'TIMEOUT': int(os.getenv('NOTES_RESPONSE_CACHE_TIMEOUT', 300)),
+}
+
 # CORS
 CORS_ALLOW_ALL_ORIGINS = True
 CORS_ALLOW_CREDENTIALS = True
@@ -4,6 +4,7 @@ from django.http import HttpResponse
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
+from apps.users.views import JWKSView
 
 schema_view = get_schema_view(
     openapi.Info(
@@ -32,6 +33,7 @@ def home_view(request):
 urlpatterns = [
     path('', home_view, name='home'),
     path('admin/', admin.site.urls),
+    path('.well-known/jwks.json', JWKSView.as_view(), name='jwks'),
     path('api/auth/', include('apps.users.urls')),
     path('api/notes/', include('apps.notes.urls')),
     path('redoc/', schema_view.with_ui('redoc',